@@ -3,7 +3,7 @@
 
 a = Analysis(
     ['pokemon_game/main.py'],
-    pathex=[],
+    pathex=[os.path.join(SPECPATH, 'pokemon_game')],  # main.py imports its siblings as top-level modules
     binaries=[],
     datas=[],
     hiddenimports=[],
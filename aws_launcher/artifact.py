@@ -0,0 +1,244 @@
+import argparse
+import glob
+import hashlib
+import importlib.metadata
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+try:
+    from .remote import upload
+except ImportError:
+    from remote import upload
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SPEC_FILE = os.path.join(REPO_ROOT, 'PokemonDraw.spec')
+SOURCE_DIR = os.path.join(REPO_ROOT, 'pokemon_game')
+ARTIFACT_DIR = os.path.join(REPO_ROOT, '.artifacts')
+BINARY_NAME = 'PokemonDraw'  # Matches name= in the spec
+KEEP_ARTIFACTS = 5  # Older builds beyond this many are deleted
+
+# The hosts: Amazon Linux 2 on x86_64. PyInstaller bundles the build
+# machine's interpreter, which needs a glibc no newer than the hosts' one.
+TARGET_SYSTEM = 'Linux'
+TARGET_MACHINE = 'x86_64'
+TARGET_GLIBC = (2, 26)
+
+# Third-party packages bundled into the binary (requests and its dependencies)
+BUNDLED_PACKAGES = ('requests', 'urllib3', 'certifi', 'charset-normalizer', 'idna')
+
+# Machines that can't build for the hosts build in a container of the hosts'
+# image instead, with pinned versions so the cache key stays meaningful.
+BUILD_IMAGE = 'amazonlinux:2'
+CONTAINER_PLATFORM = 'linux/amd64'
+CONTAINER_SETUP = ("amazon-linux-extras install -y python3.8 >/dev/null && yum install -y -q binutils && "
+                   "python3.8 -m pip install -q pyinstaller==6.10.0 requests==2.32.3")
+
+class ArtifactBuildError(Exception):
+    """PyInstaller or docker is missing, this machine can't build for the hosts, or the build failed."""
+
+class Artifact:
+    """A built binary in the local cache.
+
+    `key` identifies the inputs it was built from; `sha256` is the digest of
+    the binary itself, used to tell whether a host already has it.
+    """
+
+    def __init__(self, path, key, sha256, size, cached):
+        self.path = path
+        self.key = key
+        self.sha256 = sha256
+        self.size = size
+        self.cached = cached
+
+def source_files():
+    """The files the binary is built from: the spec and the game's modules.
+
+    Only the top level of pokemon_game is bundled; poke_api_full is the
+    separate backend app.
+    """
+    return [SPEC_FILE] + sorted(glob.glob(os.path.join(SOURCE_DIR, '*.py')))
+
+def package_version(name):
+    """Installed version of a distribution, or None if it isn't installed."""
+    try:
+        return importlib.metadata.version(name)
+    except importlib.metadata.PackageNotFoundError:
+        return None
+
+def toolchain(builder='local'):
+    """Build settings that change the binary without changing the sources."""
+    if builder == 'container':
+        return {'image': BUILD_IMAGE, 'platform': CONTAINER_PLATFORM, 'setup': CONTAINER_SETUP}
+    libc, libc_version = platform.libc_ver()
+    return {
+        'python': platform.python_version(),
+        'platform': f"{platform.system()}-{platform.machine()}",
+        'libc': f"{libc}-{libc_version}" if libc else None,
+        'pyinstaller': package_version('pyinstaller'),
+        'packages': {name: package_version(name) for name in BUNDLED_PACKAGES},
+    }
+
+def local_platform_problem():
+    """Why binaries built on this machine wouldn't run on the hosts, or None if they would."""
+    system, machine = platform.system(), platform.machine()
+    if (system, machine) != (TARGET_SYSTEM, TARGET_MACHINE):
+        return f"Can't build for {TARGET_SYSTEM}-{TARGET_MACHINE} hosts on {system}-{machine}"
+    libc, libc_version = platform.libc_ver()
+    glibc = tuple(int(part) for part in libc_version.split('.')[:2]) if libc == 'glibc' else None
+    if glibc is None or glibc > TARGET_GLIBC:
+        target = '.'.join(map(str, TARGET_GLIBC))
+        found = f"{libc} {libc_version}" if libc else "an unknown libc"
+        return (f"This machine has {found}; the hosts have glibc {target} and can't run a binary "
+                f"that needs a newer one")
+    return None
+
+def check_build_platform():
+    """Return where to build binaries that run on the hosts: 'local' or 'container'.
+
+    Builds in a BUILD_IMAGE container when this machine can't build for the
+    hosts; raises ArtifactBuildError if docker isn't installed for that.
+    Cheap, so deploy_app calls it before creating any AWS resources.
+    """
+    problem = local_platform_problem()
+    if problem is None:
+        return 'local'
+    if shutil.which('docker') is None:
+        raise ArtifactBuildError(
+            f"{problem}. Install docker to build in an {BUILD_IMAGE} container, "
+            f"or build on an x86_64 Linux machine with glibc <= {'.'.join(map(str, TARGET_GLIBC))}"
+        )
+    return 'container'
+
+def source_key(builder='local'):
+    """Content address of a build: sha256 over the source files and the toolchain."""
+    digest = hashlib.sha256()
+    for path in source_files():
+        digest.update(os.path.relpath(path, REPO_ROOT).encode() + b'\0')
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+        digest.update(b'\0')
+    digest.update(json.dumps(toolchain(builder), sort_keys=True).encode())
+    return digest.hexdigest()
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def cached_artifact(key):
+    """Return the Artifact built from `key`, or None if it isn't in the cache."""
+    binary = os.path.join(ARTIFACT_DIR, f"{BINARY_NAME}-{key[:16]}")
+    try:
+        with open(f"{binary}.json") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get('key') != key or not os.path.isfile(binary):
+        return None
+    return Artifact(binary, key, manifest['sha256'], manifest['size'], cached=True)
+
+def container_build_command(work_dir):
+    """docker command running PyInstaller in BUILD_IMAGE, with the output in `work_dir`/dist."""
+    owner = f"{os.getuid()}:{os.getgid()}" if hasattr(os, 'getuid') else None
+    script = (f"{CONTAINER_SETUP} && python3.8 -m PyInstaller --noconfirm --clean "
+              f"--distpath /work/dist --workpath /work/build /src/{os.path.basename(SPEC_FILE)}")
+    if owner:
+        script += f" && chown -R {owner} /work"  # Files the container creates belong to root otherwise
+    return ['docker', 'run', '--rm', '--platform', CONTAINER_PLATFORM,
+            '-v', f"{REPO_ROOT}:/src:ro", '-v', f"{work_dir}:/work", BUILD_IMAGE, 'bash', '-c', script]
+
+def build_artifact(force=False):
+    """Build the game binary from PokemonDraw.spec unless an identical build is cached.
+
+    Builds on this machine when it matches the hosts, otherwise in a
+    BUILD_IMAGE container (see check_build_platform); ArtifactBuildError is
+    raised up front if neither is possible.
+    """
+    builder = check_build_platform()
+    key = source_key(builder)
+    if not force:
+        artifact = cached_artifact(key)
+        if artifact is not None:
+            print(f"Using cached {BINARY_NAME} build {key[:16]}")
+            return artifact
+    if builder == 'local' and toolchain()['pyinstaller'] is None:
+        raise ArtifactBuildError("PyInstaller is not installed (pip install pyinstaller)")
+
+    os.makedirs(ARTIFACT_DIR, exist_ok=True)
+    where = f"in an {BUILD_IMAGE} container" if builder == 'container' else "locally"
+    print(f"Building {BINARY_NAME} {key[:16]} with PyInstaller {where}...")
+    started = time.time()
+    with tempfile.TemporaryDirectory(prefix='pyinstaller-') as work_dir:
+        if builder == 'container':
+            command = container_build_command(work_dir)
+        else:
+            command = [sys.executable, '-m', 'PyInstaller', '--noconfirm', '--clean',
+                       '--distpath', os.path.join(work_dir, 'dist'),
+                       '--workpath', os.path.join(work_dir, 'build'), SPEC_FILE]
+        log_path = os.path.join(ARTIFACT_DIR, 'build.log')
+        with open(log_path, 'w') as log:
+            result = subprocess.run(command, cwd=REPO_ROOT, stdout=log, stderr=subprocess.STDOUT)
+        built = os.path.join(work_dir, 'dist', BINARY_NAME)
+        if result.returncode != 0 or not os.path.isfile(built):
+            raise ArtifactBuildError(f"PyInstaller failed {where} (exit {result.returncode}), see {log_path}")
+        binary = os.path.join(ARTIFACT_DIR, f"{BINARY_NAME}-{key[:16]}")
+        shutil.copyfile(built, f"{binary}.part")
+    os.chmod(f"{binary}.part", 0o755)
+    os.replace(f"{binary}.part", binary)
+
+    artifact = Artifact(binary, key, file_sha256(binary), os.path.getsize(binary), cached=False)
+    manifest = {'key': key, 'sha256': artifact.sha256, 'size': artifact.size,
+                'built_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+                'build_seconds': round(time.time() - started, 1), 'toolchain': toolchain(builder)}
+    with open(f"{binary}.json", 'w') as f:
+        json.dump(manifest, f, indent=2)
+    prune_artifacts()
+    print(f"Built {binary} ({artifact.size / 1e6:.1f} MB) in {manifest['build_seconds']}s")
+    return artifact
+
+def prune_artifacts(keep=KEEP_ARTIFACTS):
+    """Delete all but the `keep` most recent builds."""
+    builds = sorted(glob.glob(os.path.join(ARTIFACT_DIR, f"{BINARY_NAME}-*.json")), key=os.path.getmtime, reverse=True)
+    for manifest in builds[keep:]:
+        for path in (manifest[:-len('.json')], manifest):
+            if os.path.exists(path):
+                os.remove(path)
+
+def remote_sha256(ssh, remote_path):
+    """sha256 of a file on the host, or None if it doesn't exist."""
+    stdin, stdout, stderr = ssh.exec_command(f"sha256sum {remote_path} 2>/dev/null")
+    output = stdout.read().decode().split()
+    return output[0] if output else None
+
+def ship_artifact(ssh, artifact, remote_path):
+    """Upload the binary over SFTP unless the host already has this exact build.
+
+    Returns True if it was uploaded. Hosts are independent, so callers
+    configuring a fleet run this from each host's worker thread.
+    """
+    if remote_sha256(ssh, remote_path) == artifact.sha256:
+        return False
+    upload(ssh, artifact.path, remote_path, mode=0o755)
+    return True
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=f"Build the {BINARY_NAME} binary into {ARTIFACT_DIR}.")
+    parser.add_argument('--force', action='store_true', help="rebuild even if the sources are unchanged")
+    args = parser.parse_args(argv)
+    try:
+        artifact = build_artifact(args.force)
+    except ArtifactBuildError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    print(f"{artifact.path}  sha256 {artifact.sha256}")
+
+if __name__ == "__main__":
+    main()
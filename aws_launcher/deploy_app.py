@@ -5,8 +5,23 @@ import uuid
 import os
 import configparser
 import socket
+import threading
+import argparse
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from botocore.exceptions import NoCredentialsError, PartialCredentialsError, ClientError
 
+try:
+    from .artifact import ArtifactBuildError, build_artifact, check_build_platform, ship_artifact
+    from .readiness import ReadinessTimeout, ReadinessTimer, wait_for_status_checks, wait_until_ready
+    from .remote import RemoteScript, print_step_table
+    from .taskgraph import TaskGraph, TaskGraphError
+except ImportError:
+    from artifact import ArtifactBuildError, build_artifact, check_build_platform, ship_artifact
+    from readiness import ReadinessTimeout, ReadinessTimer, wait_for_status_checks, wait_until_ready
+    from remote import RemoteScript, print_step_table
+    from taskgraph import TaskGraph, TaskGraphError
+
 # AWS configuration
 AWS_REGION = 'us-west-2'
 INSTANCE_TYPE = 't3.micro'
@@ -14,10 +29,25 @@ GITHUB_GAME_REPO = 'https://github.com/GRRosti/aws-git-demo.git'  # Repository c
 GAME_PORT = 8000  # Port for server-based game (adjust if needed)
 USER_DATA_FILE = 'aws_launcher/user_data.sh'
 CREDENTIALS_FILE = 'aws_launcher/credentials.txt'
+WAITER_DELAY = 5  # Seconds between describe_instances polls while waiting for instances
+WAITER_MAX_ATTEMPTS = 60
+FLEET_SSH_WORKERS = 10  # Hosts configured over SSH at the same time in fleet mode
+READY_TIMEOUT = 600  # Seconds for a new instance to accept SSH and finish cloud-init
+WAIT_FOR_STATUS_CHECKS = False  # Also wait for EC2's two status checks (usually takes minutes)
+WAIT_FOR_CLOUD_INIT = False  # Setup only uploads a prebuilt binary, so it needn't wait for the user data's yum update
+SETUP_TIMEOUT = 300  # Seconds for the whole setup script to run on a host
+REMOTE_BINARY = '/home/ec2-user/PokemonDraw'  # Where the prebuilt game binary is installed
 
 # Generate a unique key pair name
 KEY_NAME = f'app-key-{uuid.uuid4().hex[:8]}'
 
+class LaunchError(Exception):
+    """Launching failed after instances were created; `instances` lists them for cleanup."""
+
+    def __init__(self, message, instances):
+        super().__init__(message)
+        self.instances = instances
+
 # Load credentials from local credentials file
 def load_credentials():
     """Load AWS credentials from local credentials file."""
@@ -72,6 +102,21 @@ except ClientError as e:
         )
     raise Exception(f"Error initializing AWS session: {e}")
 
+# boto3 clients are thread-safe, but resources and sessions are not:
+# provisioning steps running in parallel each get their own resource.
+_thread_local = threading.local()
+_session_lock = threading.Lock()
+
+def get_ec2_resource():
+    """Return this thread's EC2 resource (the module-level one on the main thread)."""
+    if threading.current_thread() is threading.main_thread():
+        return ec2_resource
+    resource = getattr(_thread_local, 'ec2_resource', None)
+    if resource is None:
+        with _session_lock:
+            resource = _thread_local.ec2_resource = boto3_session.resource('ec2')
+    return resource
+
 def get_latest_amazon_linux_2_ami():
     """Fetch the latest Amazon Linux 2 AMI ID."""
     try:
@@ -103,18 +148,30 @@ def create_key_pair():
     except ClientError as e:
         raise Exception(f"Error creating key pair: {e}")
 
-def create_vpc_and_network():
-    """Create VPC, subnet, internet gateway, and route table."""
+def create_vpc():
+    """Create the VPC and wait until it is available."""
     try:
-        vpc = ec2_resource.create_vpc(CidrBlock='10.0.0.0/16')
+        vpc = get_ec2_resource().create_vpc(CidrBlock='10.0.0.0/16')
         vpc.create_tags(Tags=[{'Key': 'Name', 'Value': 'AppVPC'}])
         vpc.wait_until_available()
+        return vpc.id
+    except ClientError as e:
+        raise Exception(f"Error creating VPC: {e}")
 
-        igw = ec2_resource.create_internet_gateway()
-        igw.attach_to_vpc(VpcId=vpc.id)
+def create_internet_gateway(vpc_id):
+    """Create an internet gateway and attach it to the VPC."""
+    try:
+        igw = get_ec2_resource().create_internet_gateway()
+        igw.attach_to_vpc(VpcId=vpc_id)
         igw.create_tags(Tags=[{'Key': 'Name', 'Value': 'AppIGW'}])
+        return igw.id
+    except ClientError as e:
+        raise Exception(f"Error creating internet gateway: {e}")
 
-        subnet = vpc.create_subnet(CidrBlock='10.0.1.0/24')
+def create_subnet(vpc_id):
+    """Create the subnet with auto-assigned public IPs."""
+    try:
+        subnet = get_ec2_resource().Vpc(vpc_id).create_subnet(CidrBlock='10.0.1.0/24')
         subnet.create_tags(Tags=[{'Key': 'Name', 'Value': 'AppSubnet'}])
         
         # Enable auto-assign public IP for the subnet
@@ -122,20 +179,33 @@ def create_vpc_and_network():
             SubnetId=subnet.id,
             MapPublicIpOnLaunch={'Value': True}
         )
+        return subnet.id
+    except ClientError as e:
+        raise Exception(f"Error creating subnet: {e}")
 
-        route_table = vpc.create_route_table()
-        route_table.create_route(DestinationCidrBlock='0.0.0.0/0', GatewayId=igw.id)
-        route_table.associate_with_subnet(SubnetId=subnet.id)
+def create_route_table(vpc_id, igw_id, subnet_id):
+    """Route the subnet's outbound traffic through the internet gateway."""
+    try:
+        route_table = get_ec2_resource().Vpc(vpc_id).create_route_table()
+        route_table.create_route(DestinationCidrBlock='0.0.0.0/0', GatewayId=igw_id)
+        route_table.associate_with_subnet(SubnetId=subnet_id)
         route_table.create_tags(Tags=[{'Key': 'Name', 'Value': 'AppRouteTable'}])
-
-        return vpc.id, subnet.id
+        return route_table.id
     except ClientError as e:
-        raise Exception(f"Error creating network resources: {e}")
+        raise Exception(f"Error creating route table: {e}")
+
+def create_vpc_and_network():
+    """Create VPC, subnet, internet gateway, and route table."""
+    vpc_id = create_vpc()
+    igw_id = create_internet_gateway(vpc_id)
+    subnet_id = create_subnet(vpc_id)
+    create_route_table(vpc_id, igw_id, subnet_id)
+    return vpc_id, subnet_id
 
 def create_security_group(vpc_id):
     """Create a security group with SSH and game port access."""
     try:
-        sg = ec2_resource.create_security_group(
+        sg = get_ec2_resource().create_security_group(
             GroupName=f'app-sg-{uuid.uuid4().hex[:8]}',
             Description='Security group for game server',
             VpcId=vpc_id
@@ -161,7 +231,7 @@ def create_security_group(vpc_id):
     except ClientError as e:
         raise Exception(f"Error creating security group: {e}")
 
-def check_instance_connectivity(ip_address, port=22, timeout=2):
+def check_instance_connectivity(ip_address, port=22, timeout=2, verbose=True):
     """Check connectivity to the instance by attempting a TCP connection."""
     try:
         sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -169,13 +239,16 @@ def check_instance_connectivity(ip_address, port=22, timeout=2):
         result = sock.connect_ex((ip_address, port))
         sock.close()
         if result == 0:
-            print(f"Connectivity to {ip_address}:{port} successful.")
+            if verbose:
+                print(f"Connectivity to {ip_address}:{port} successful.")
             return True
         else:
-            print(f"Connectivity to {ip_address}:{port} failed (error code: {result}).")
+            if verbose:
+                print(f"Connectivity to {ip_address}:{port} failed (error code: {result}).")
             return False
     except Exception as e:
-        print(f"Error checking connectivity to {ip_address}:{port}: {e}")
+        if verbose:
+            print(f"Error checking connectivity to {ip_address}:{port}: {e}")
         return False
 
 def check_instance_status(instance_id):
@@ -189,18 +262,24 @@ def check_instance_status(instance_id):
     except ClientError as e:
         raise Exception(f"Error checking instance status: {e}")
 
-def launch_ec2_instance(subnet_id, sg_id, key_name):
-    """Launch EC2 instance with minimal user data."""
+def launch_ec2_instances(subnet_id, sg_id, key_name, ami_id=None, count=1):
+    """Launch `count` EC2 instances with one API call and return [(instance_id, public_ip, allocation_id)].
+
+    All instances are awaited together: each poll is a single
+    describe_instances call covering the whole fleet. If anything fails once
+    the instances exist, LaunchError carries those already created (and any
+    Elastic IPs allocated for them) so they can be cleaned up.
+    """
     try:
-        ami_id = get_latest_amazon_linux_2_ami()
+        ami_id = ami_id or get_latest_amazon_linux_2_ami()
         user_data = """#!/bin/bash
         yum update -y
         """
-        instance = ec2_resource.create_instances(
+        instances = get_ec2_resource().create_instances(
             ImageId=ami_id,
             InstanceType=INSTANCE_TYPE,
-            MinCount=1,
-            MaxCount=1,
+            MinCount=count,
+            MaxCount=count,
             SubnetId=subnet_id,
             SecurityGroupIds=[sg_id],
             KeyName=key_name,
@@ -209,101 +288,179 @@ def launch_ec2_instance(subnet_id, sg_id, key_name):
                 'ResourceType': 'instance',
                 'Tags': [{'Key': 'Name', 'Value': 'GameServer'}]
             }]
-        )[0]
-        instance.wait_until_running()
-        instance.reload()
-        if not instance.public_ip_address:
-            # Fallback: Associate an Elastic IP
-            allocation = ec2_client.allocate_address(Domain='vpc')
-            ec2_client.associate_address(
-                InstanceId=instance.id,
-                AllocationId=allocation['AllocationId']
-            )
-            instance.reload()
-            return instance.id, instance.public_ip_address, allocation['AllocationId']
-        return instance.id, instance.public_ip_address, None
+        )
     except ClientError as e:
-        raise Exception(f"Error launching EC2 instance: {e}")
+        raise Exception(f"Error launching EC2 instances: {e}")
 
-def setup_and_launch_game(ip_address, key_name):
-    """Connect via SSH, clone the game repo, install and compile the game, and set up auto-launch."""
-    ssh = paramiko.SSHClient()
-    ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+    # Recorded before anything else can fail, so the instances are never leaked
+    launched = {instance.id: (instance.id, None, None) for instance in instances}
+    instance_ids = list(launched)
     try:
-        key = paramiko.RSAKey.from_private_key_file(f'{KEY_NAME}.pem')
+        ec2_client.get_waiter('instance_running').wait(
+            InstanceIds=instance_ids,
+            WaiterConfig={'Delay': WAITER_DELAY, 'MaxAttempts': WAITER_MAX_ATTEMPTS}
+        )
+        response = ec2_client.describe_instances(InstanceIds=instance_ids)
+        public_ips = {
+            instance['InstanceId']: instance.get('PublicIpAddress')
+            for reservation in response['Reservations'] for instance in reservation['Instances']
+        }
+
+        for instance_id in instance_ids:
+            public_ip, allocation_id = public_ips.get(instance_id), None
+            if not public_ip:
+                # Fallback: Associate an Elastic IP
+                allocation = ec2_client.allocate_address(Domain='vpc')
+                allocation_id = allocation['AllocationId']
+                launched[instance_id] = (instance_id, None, allocation_id)
+                ec2_client.associate_address(InstanceId=instance_id, AllocationId=allocation_id)
+                public_ip = allocation['PublicIp']
+            launched[instance_id] = (instance_id, public_ip, allocation_id)
+        return list(launched.values())
+    except Exception as e:
+        raise LaunchError(f"Error launching EC2 instances: {e}", list(launched.values())) from e
+
+def launch_ec2_instance(subnet_id, sg_id, key_name, ami_id=None):
+    """Launch EC2 instance with minimal user data (on the latest Amazon Linux 2 AMI by default)."""
+    return launch_ec2_instances(subnet_id, sg_id, key_name, ami_id, count=1)[0]
+
+def setup_and_launch_game(ip_address, key_name, instance_id=None, timer=None, artifact=None,
+                          status_checks=WAIT_FOR_STATUS_CHECKS, cloud_init=WAIT_FOR_CLOUD_INIT):
+    """Connect via SSH, upload the prebuilt game binary and set up auto-launch.
+
+    `artifact` comes from build_artifact(); when omitted it is built here
+    (or taken from the local cache). Waits for the host with the readiness
+    helpers (TCP probe and SSH with backoff, optionally EC2 status checks
+    and cloud-init) instead of fixed sleeps; pass a ReadinessTimer to
+    collect time-to-ready per stage.
+    """
+    timer = timer or ReadinessTimer(ip_address)
+    artifact = artifact or build_artifact()
+    ssh = None
+    try:
+        key = paramiko.RSAKey.from_private_key_file(f'{key_name}.pem')
         print(f"Connecting to {ip_address} via SSH...")
-        
-        for _ in range(30):
-            try:
-                ssh.connect(ip_address, username='ec2-user', pkey=key)
-                print("SSH connection established.")
-                
-                commands = [
-                    "sudo yum update -y",
-                    "sudo yum install -y git python3 python3-pip",
-                    "pip3 install pyinstaller pygame",
-                    f"git clone {GITHUB_GAME_REPO} /home/ec2-user/game",
-                    "ls -lR /home/ec2-user/game",  # Debug: Recursively list all files
-                    "[ -d /home/ec2-user/game/pokemon_game ] || echo 'Error: pokemon_game directory not found'",
-                    "cd /home/ec2-user/game/pokemon_game",
-                    "ls -l",  # Debug: Check pokemon_game contents
-                    # Find Python files
-                    "find . -maxdepth 1 -type f -name '*.py' || echo 'Error: No Python files found'",
-                    # Identify main script
-                    "MAIN_PY=$(find . -maxdepth 1 -type f -name '*.py' | head -n 1); [ -n \"$MAIN_PY\" ] && basename \"$MAIN_PY\" || echo 'Error: No main script found'",
-                    "[ -f main.py ] || echo 'Trying main.py: Not found'",
-                    # Run pyinstaller
-                    "[ -f main.py ] && pyinstaller --onefile main.py > pyinstaller.log 2>&1 || echo 'Skipping pyinstaller for main.py'",
-                    "[ ! -f main.py ] && [ -n \"$MAIN_PY\" ] && pyinstaller --onefile \"$MAIN_PY\" > pyinstaller.log 2>&1 || echo 'Skipping pyinstaller for alternative script'",
-                    # Check executable
-                    "[ -f dist/main/main ] || [ -n \"$MAIN_PY\" ] && [ -f dist/$(basename \"$MAIN_PY\" .py)/$(basename \"$MAIN_PY\" .py) ] || echo 'Error: main executable not found'",
-                    # Set permissions
-                    "[ -f dist/main/main ] && sudo chmod +x dist/main/main || [ -n \"$MAIN_PY\" ] && sudo chmod +x dist/$(basename \"$MAIN_PY\" .py)/$(basename \"$MAIN_PY\" .py) || echo 'Skipping chmod'",
-                    # Set up auto-launch with welcome message
-                    "echo 'echo \"Welcome to Pokemon Game! Attempting to launch...\"' >> ~/.bashrc",
-                    "MAIN_EXEC=$( [ -f dist/main/main ] && echo 'dist/main/main' || echo \"dist/$(basename \"$MAIN_PY\" .py)/$(basename \"$MAIN_PY\" .py)\" ); echo '[ -t 0 ] && [ -f /home/ec2-user/game/pokemon_game/$MAIN_EXEC ] && /home/ec2-user/game/pokemon_game/$MAIN_EXEC || echo \"Error: Game executable not found\"' >> ~/.bashrc",
-                    # Verify shell and .bashrc
-                    "echo $SHELL",
-                    "cat ~/.bashrc",
-                    # Test executable
-                    "[ -f dist/main/main ] && ./dist/main/main || [ -n \"$MAIN_PY\" ] && ./dist/$(basename \"$MAIN_PY\" .py)/$(basename \"$MAIN_PY\" .py) || echo 'Error: Cannot run main executable'",
-                    # Show pyinstaller log if needed
-                    "[ ! -f dist/main/main ] && [ ! -f dist/$(basename \"$MAIN_PY\" .py)/$(basename \"$MAIN_PY\" .py) ] && cat pyinstaller.log || echo 'PyInstaller log not needed'"
-                ]
-                
-                for cmd in commands:
-                    print(f"Executing: {cmd}")
-                    stdin, stdout, stderr = ssh.exec_command(cmd)
-                    exit_status = stdout.channel.recv_exit_status()
-                    stdout_output = stdout.read().decode()
-                    stderr_output = stderr.read().decode()
-                    if stdout_output:
-                        print(f"Output: {stdout_output}")
-                    if stderr_output:
-                        print(f"Error output: {stderr_output}")
-                    if exit_status != 0 and "ls" not in cmd and "echo" not in cmd and ">>" not in cmd and "find" not in cmd and "cat" not in cmd:
-                        print(f"Error executing {cmd}: Exit status {exit_status}")
-                        return False
-                
-                print("Game setup complete. Game should auto-launch on SSH login.")
-                return True
-            except Exception as e:
-                print(f"Waiting for SSH... {e}")
-                time.sleep(10)
+        ssh = wait_until_ready(
+            ip_address, 'ec2-user', key,
+            probe=lambda ip, port: check_instance_connectivity(ip, port, verbose=False),
+            timer=timer, timeout=READY_TIMEOUT,
+            ec2_client=ec2_client if status_checks else None, instance_id=instance_id,
+            cloud_init=cloud_init
+        )
+        print(f"SSH connection established. {timer.summary()}")
+
+        if ship_artifact(ssh, artifact, REMOTE_BINARY):
+            print(f"Uploaded {artifact.size / 1e6:.1f} MB binary to {ip_address}")
+        else:
+            print(f"{ip_address} already has build {artifact.key[:16]}")
+        timer.mark('uploaded')
+
+        # One script over one channel; check=False steps are diagnostics whose failure shouldn't stop the setup.
+        script = RemoteScript()
+        script.add(f"echo '{artifact.sha256}  {REMOTE_BINARY}' | sha256sum -c -")
+        # Set up auto-launch with welcome message (once, so re-running setup doesn't stack copies)
+        script.add(
+            "grep -q '# pokemon-draw' ~/.bashrc || printf '%s\\n' '# pokemon-draw' "
+            "'echo \"Welcome to Pokemon Game! Attempting to launch...\"' "
+            f"'[ -t 0 ] && [ -x {REMOTE_BINARY} ] && {REMOTE_BINARY} || echo \"Error: Game executable not found\"' "
+            ">> ~/.bashrc"
+        )
+        # Test executable: without a terminal it should start, then exit at the first prompt
+        script.add(f"timeout 30 {REMOTE_BINARY} < /dev/null; [ $? -lt 124 ] || echo 'Error: Cannot run main executable'", check=False)
+
+        results = script.run(
+            ssh,
+            on_output=lambda stream, index, line: print(f"{ip_address} {'!' if stream == 'stderr' else '|'} {line}"),
+            timeout=SETUP_TIMEOUT
+        )
+        print_step_table(results, ip_address)
+        for result, (command, check) in zip(results, script.steps):
+            if check and result.exit_status not in (None, 0):
+                print(f"Error executing {command}: Exit status {result.exit_status}")
+                return False
+
+        print("Game setup complete. Game should auto-launch on SSH login.")
+        timer.mark('game_ready')
+        return True
+    except ReadinessTimeout as e:
+        print(f"Host {ip_address} never became ready: {e}")
         return False
     except Exception as e:
         raise Exception(f"Error during SSH setup or game launch: {e}")
     finally:
-        ssh.close()
+        if ssh is not None:
+            ssh.close()
+
+def setup_fleet(hosts, key_name, max_workers=FLEET_SSH_WORKERS, status_checks=WAIT_FOR_STATUS_CHECKS, **options):
+    """Run setup_and_launch_game on every (instance_id, public_ip) concurrently.
+
+    With `status_checks`, EC2 status checks are awaited once for the whole
+    fleet (one describe_instance_status call per poll) before any host is
+    set up; hosts whose checks don't pass are reported as failed. Other
+    `options` are passed on to setup_and_launch_game. Returns one
+    {"instance_id", "ip", "ok", "seconds", "ready", "error"} row per host, in
+    the order given. "seconds" and the time-to-ready stages in "ready" count
+    from when the host's own setup started, so they leave out the fleet-wide
+    status checks and the wait for a free worker.
+    """
+    unhealthy = set()
+    if status_checks:
+        print(f"Waiting for EC2 status checks on {len(hosts)} instances...")
+        started = time.monotonic()
+        passed = wait_for_status_checks(ec2_client, [instance_id for instance_id, _ in hosts], READY_TIMEOUT)
+        unhealthy = {instance_id for instance_id, _ in hosts if instance_id not in passed}
+        print(f"EC2 status checks passed on {len(passed)}/{len(hosts)} instances after "
+              f"{time.monotonic() - started:.0f}s")
+
+    def setup(instance_id, ip_address):
+        timer = ReadinessTimer(ip_address)
+        if instance_id in unhealthy:
+            ok, error = False, f"EC2 status checks did not pass within {READY_TIMEOUT}s"
+        else:
+            try:
+                ok, error = setup_and_launch_game(ip_address, key_name, instance_id, timer,
+                                                  status_checks=False, **options), None
+            except Exception as e:
+                ok, error = False, str(e)
+        return {"instance_id": instance_id, "ip": ip_address, "ok": ok,
+                "seconds": time.monotonic() - timer.started, "ready": dict(timer.stages), "error": error}
 
-def cleanup_resources(instance_id, vpc_id, sg_id, key_name, allocation_id):
-    """Clean up AWS resources."""
+    rows = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(hosts)))) as executor:
+        futures = {executor.submit(setup, instance_id, ip): instance_id for instance_id, ip in hosts}
+        for future in as_completed(futures):
+            row = future.result()
+            rows[row["instance_id"]] = row
+            print(f"{row['ip']}: {'ready' if row['ok'] else 'failed'} after {row['seconds']:.0f}s")
+    return [rows[instance_id] for instance_id, _ in hosts]
+
+def print_fleet_table(rows):
+    """Print one line per host with its setup result and time."""
+    print(f"{'Instance':<21}{'Public IP':<17}{'Result':<8}{'SSH (s)':>8}{'Time (s)':>9}  Error")
+    for row in rows:
+        result = 'ok' if row['ok'] else 'FAILED'
+        ssh_ready = row.get('ready', {}).get('ssh')
+        ssh_ready = f"{ssh_ready:.1f}" if ssh_ready is not None else '-'
+        print(f"{row['instance_id']:<21}{row['ip'] or '-':<17}{result:<8}{ssh_ready:>8}{row['seconds']:>9.1f}  "
+              f"{row['error'] or ''}")
+    succeeded = sum(1 for row in rows if row['ok'])
+    print(f"{succeeded}/{len(rows)} hosts ready")
+
+def cleanup_resources(instance_ids, vpc_id, sg_id, key_name, allocation_ids):
+    """Clean up AWS resources; instance_ids and allocation_ids may be single ids or lists."""
+    instance_ids = [instance_ids] if isinstance(instance_ids, str) else [i for i in instance_ids or [] if i]
+    allocation_ids = [allocation_ids] if isinstance(allocation_ids, str) else [a for a in allocation_ids or [] if a]
     try:
-        if instance_id:
-            ec2_client.terminate_instances(InstanceIds=[instance_id])
-            print(f"Terminated instance: {instance_id}")
+        if instance_ids:
+            ec2_client.terminate_instances(InstanceIds=instance_ids)
+            print(f"Terminated instances: {', '.join(instance_ids)}")
+            # The security group and subnet can only go once the instances are gone
+            ec2_client.get_waiter('instance_terminated').wait(
+                InstanceIds=instance_ids,
+                WaiterConfig={'Delay': WAITER_DELAY, 'MaxAttempts': WAITER_MAX_ATTEMPTS}
+            )
         
-        if allocation_id:
+        for allocation_id in allocation_ids:
             ec2_client.release_address(AllocationId=allocation_id)
             print(f"Released Elastic IP: {allocation_id}")
         
@@ -323,6 +480,10 @@ def cleanup_resources(instance_id, vpc_id, sg_id, key_name, allocation_id):
                 print(f"Deleted internet gateway: {igw.id}")
             
             for rt in vpc.route_tables.all():
+                if any(association.get('Main') for association in rt.associations_attribute):
+                    continue  # The main route table goes away with the VPC
+                for association in rt.associations_attribute:
+                    ec2_client.disassociate_route_table(AssociationId=association['RouteTableAssociationId'])
                 rt.delete()
                 print(f"Deleted route table: {rt.id}")
             
@@ -337,25 +498,96 @@ def cleanup_resources(instance_id, vpc_id, sg_id, key_name, allocation_id):
     except ClientError as e:
         print(f"Error during cleanup: {e}")
 
-def main():
-    vpc_id = subnet_id = sg_id = instance_id = public_ip = key_name = allocation_id = None
+def provision(count=1, force_build=False):
+    """Build the provisioning graph: steps that don't depend on each other run in parallel.
+
+    key_pair, ami, vpc and the local game build start together; once the
+    VPC exists, the internet gateway, subnet and security group are created
+    concurrently.
+    """
+    graph = TaskGraph()
+    graph.add('artifact', lambda: build_artifact(force_build))
+    graph.add('key_pair', create_key_pair)
+    graph.add('ami', get_latest_amazon_linux_2_ami)
+    graph.add('vpc', create_vpc)
+    graph.add('igw', create_internet_gateway, deps=['vpc'])
+    graph.add('subnet', create_subnet, deps=['vpc'])
+    graph.add('route_table', create_route_table, deps=['vpc', 'igw', 'subnet'])
+    graph.add('security_group', create_security_group, deps=['vpc'])
+
+    def launch(subnet_id, sg_id, key_name, ami_id, route_table_id):
+        # Waits for the route table too, so the instances are reachable once they run
+        return launch_ec2_instances(subnet_id, sg_id, key_name, ami_id, count)
+
+    graph.add('instances', launch, deps=['subnet', 'security_group', 'key_pair', 'ami', 'route_table'])
+    return graph
+
+def positive_int(value):
+    """argparse type for counts that must be at least 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value}")
+    return number
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Launch EC2 game servers for the Pokemon game.")
+    parser.add_argument('--count', type=positive_int, default=1, help="number of game servers to launch and configure")
+    parser.add_argument('--workers', type=positive_int, default=FLEET_SSH_WORKERS, help="hosts configured over SSH at a time")
+    parser.add_argument('--status-checks', action='store_true', default=WAIT_FOR_STATUS_CHECKS,
+                        help="wait for EC2 status checks to pass before connecting")
+    parser.add_argument('--cloud-init', action='store_true', default=WAIT_FOR_CLOUD_INIT,
+                        help="wait for cloud-init (the user data's yum update) to finish before running setup")
+    parser.add_argument('--force-build', action='store_true', help="rebuild the game binary even if it is cached")
+    args = parser.parse_args(argv)
+    try:
+        check_build_platform()  # Fail before creating anything that would need cleaning up
+    except ArtifactBuildError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    vpc_id = sg_id = key_name = None
+    instances = []
     try:
         print("Creating infrastructure...")
-        key_name = create_key_pair()
-        vpc_id, subnet_id = create_vpc_and_network()
-        sg_id = create_security_group(vpc_id)
-        instance_id, public_ip, allocation_id = launch_ec2_instance(subnet_id, sg_id, key_name)
+        graph = provision(args.count, args.force_build)
+        try:
+            resources, failure = graph.run(), None
+        except TaskGraphError as e:
+            resources, failure = e.results, e  # Keep what was created so it can be cleaned up
+        graph.print_timings()
+        key_name = resources.get('key_pair')
+        vpc_id = resources.get('vpc')
+        sg_id = resources.get('security_group')
+        instances = resources.get('instances', [])
+        if failure is not None:
+            if isinstance(failure.error, LaunchError):
+                instances = failure.error.instances  # Created before the launch step failed
+            raise failure
+        ready_options = {'artifact': resources['artifact'], 'status_checks': args.status_checks,
+                         'cloud_init': args.cloud_init}
         
+        print(f"SSH Key saved as: {key_name}.pem")
+        if args.count > 1:
+            for instance_id, public_ip, _ in instances:
+                check_instance_status(instance_id)
+            rows = setup_fleet([(instance_id, public_ip) for instance_id, public_ip, _ in instances],
+                               key_name, args.workers, **ready_options)
+            print_fleet_table(rows)
+            for row in rows:
+                if row['ok']:
+                    print(f"ssh -i {key_name}.pem ec2-user@{row['ip']}")
+            return
+
+        instance_id, public_ip, _ = instances[0]
         print(f"Instance launched: {instance_id}")
         print(f"Public IP: {public_ip}")
-        print(f"SSH Key saved as: {key_name}.pem")
         
         check_instance_status(instance_id)
         
-        if not check_instance_connectivity(public_ip):
-            raise Exception(f"Instance {public_ip} is not reachable.")
-        
-        if setup_and_launch_game(public_ip, key_name):
+        timer = ReadinessTimer(public_ip)
+        ready = setup_and_launch_game(public_ip, key_name, instance_id, timer, **ready_options)
+        print(f"Time to ready: {timer.summary()}")
+        if ready:
             print(f"Game setup complete! SSH into instance to play: ssh -i {key_name}.pem ec2-user@{public_ip}")
             print(f"If the game is server-based, access it at http://{public_ip}:{GAME_PORT}")
         else:
@@ -364,11 +596,13 @@ def main():
     except Exception as e:
         print(f"Error: {e}")
     finally:
-        if instance_id or vpc_id or sg_id or key_name or allocation_id:
+        instance_ids = [instance_id for instance_id, _, _ in instances]
+        allocation_ids = [allocation_id for _, _, allocation_id in instances if allocation_id]
+        if instance_ids or vpc_id or sg_id or key_name:
             cleanup = input("Do you want to clean up AWS resources? (y/n): ").lower() == 'y'
             if cleanup:
                 print("Cleaning up resources...")
-                cleanup_resources(instance_id, vpc_id, sg_id, key_name, allocation_id)
+                cleanup_resources(instance_ids, vpc_id, sg_id, key_name, allocation_ids)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,144 @@
+import random
+import socket
+import time
+
+import paramiko
+
+class ReadinessTimeout(Exception):
+    """A host did not reach a readiness stage before its deadline."""
+
+class ReadinessTimer:
+    """Records when a host reached each readiness stage, in seconds since start."""
+
+    def __init__(self, host):
+        self.host = host
+        self.started = time.monotonic()
+        self.stages = {}
+
+    def mark(self, stage):
+        self.stages[stage] = time.monotonic() - self.started
+        return self.stages[stage]
+
+    def summary(self):
+        stages = ', '.join(f"{stage} {seconds:.1f}s" for stage, seconds in self.stages.items())
+        return f"{self.host}: {stages or 'no stage reached'}"
+
+def backoff_delays(base=1.0, max_delay=15.0):
+    """Exponential backoff with full jitter: random waits in [0, min(max_delay, base * 2**n)]."""
+    attempt = 0
+    while True:
+        yield random.uniform(0, min(max_delay, base * 2 ** attempt))
+        attempt += 1
+
+def wait_for(check, timeout, description, base=1.0, max_delay=15.0):
+    """Call `check()` until it returns a truthy value, backing off between attempts.
+
+    Returns that value; raises ReadinessTimeout once `timeout` seconds have
+    passed. Exceptions from `check` count as a failed attempt; the last one
+    is chained to the timeout.
+    """
+    deadline = time.monotonic() + timeout
+    last_error = None
+    for delay in backoff_delays(base, max_delay):
+        try:
+            result = check()
+            if result:
+                return result
+            last_error = None
+        except Exception as e:
+            last_error = e
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise ReadinessTimeout(f"Timed out after {timeout:.0f}s waiting for {description}") from last_error
+        time.sleep(min(delay, remaining))
+
+def wait_for_tcp(ip_address, port, timeout, probe):
+    """Wait until `probe(ip_address, port)` (e.g. check_instance_connectivity) succeeds."""
+    return wait_for(lambda: probe(ip_address, port), timeout, f"{ip_address}:{port}", base=0.5, max_delay=8.0)
+
+def wait_for_status_checks(ec2_client, instance_ids, timeout, delay=10):
+    """Wait up to `timeout` seconds for EC2 to report both status checks ok for every instance.
+
+    Polls describe_instance_status every `delay` seconds, one call per poll
+    for all instances still pending, and counts an instance as passed only
+    once its InstanceStatus and SystemStatus are both ok. Returns the set of
+    instance ids whose checks passed; any missing ones timed out or failed.
+    """
+    deadline = time.monotonic() + timeout
+    pending = list(instance_ids)
+    passed = set()
+    while True:
+        response = ec2_client.describe_instance_status(InstanceIds=pending)
+        passed.update(
+            status['InstanceId'] for status in response['InstanceStatuses']
+            if status['InstanceStatus']['Status'] == 'ok' and status['SystemStatus']['Status'] == 'ok'
+        )
+        pending = [instance_id for instance_id in pending if instance_id not in passed]
+        if not pending or time.monotonic() + delay > deadline:
+            return passed
+        time.sleep(delay)
+
+def connect_ssh(ip_address, username, pkey, timeout, port=22):
+    """Open an SSH connection, retrying with backoff while sshd is still starting."""
+    def attempt():
+        ssh = paramiko.SSHClient()
+        ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        try:
+            ssh.connect(ip_address, port=port, username=username, pkey=pkey,
+                        timeout=10, banner_timeout=10, auth_timeout=10)
+        except (paramiko.SSHException, socket.error):
+            ssh.close()
+            raise
+        return ssh
+    return wait_for(attempt, timeout, f"SSH on {ip_address}", base=1.0, max_delay=10.0)
+
+def wait_for_cloud_init(ssh, timeout):
+    """Wait for cloud-init (user data, e.g. its yum update) to finish on the host.
+
+    Prefers `cloud-init status --wait`; falls back to polling for
+    boot-finished on images whose cloud-init lacks it. Returns True when
+    cloud-init finished without errors.
+    """
+    command = ("if cloud-init status --help >/dev/null 2>&1; then cloud-init status --wait; "
+               "else while [ ! -f /var/lib/cloud/instance/boot-finished ]; do sleep 1; done; fi")
+    stdin, stdout, stderr = ssh.exec_command(command)
+    channel = stdout.channel
+    if not channel.status_event.wait(timeout):
+        channel.close()
+        raise ReadinessTimeout(f"cloud-init did not finish within {timeout:.0f}s")
+    return channel.recv_exit_status() == 0
+
+def wait_until_ready(ip_address, username, pkey, probe, timer, timeout=600, port=22,
+                     ec2_client=None, instance_id=None, cloud_init=True):
+    """Wait for a launched instance to accept work and return a connected SSHClient.
+
+    Stages, each recorded on `timer`: status_ok (only with ec2_client and
+    instance_id), tcp, ssh and cloud_init (unless disabled). All stages
+    share the overall `timeout`; ReadinessTimeout is raised as soon as it
+    has passed, before starting the next stage.
+    """
+    deadline = time.monotonic() + timeout
+
+    def remaining(stage):
+        left = deadline - time.monotonic()
+        if left <= 0:
+            raise ReadinessTimeout(f"Timed out after {timeout}s, before {stage} on {ip_address}")
+        return left
+
+    if ec2_client is not None and instance_id is not None:
+        if instance_id not in wait_for_status_checks(ec2_client, [instance_id], remaining('status checks')):
+            raise ReadinessTimeout(f"EC2 status checks for {instance_id} did not pass within {timeout}s")
+        timer.mark('status_ok')
+    wait_for_tcp(ip_address, port, remaining('TCP'), probe)
+    timer.mark('tcp')
+    ssh = connect_ssh(ip_address, username, pkey, remaining('SSH'), port)
+    timer.mark('ssh')
+    if cloud_init:
+        try:
+            if not wait_for_cloud_init(ssh, remaining('cloud-init')):
+                print(f"Warning: cloud-init reported errors on {ip_address}")
+        except Exception:
+            ssh.close()
+            raise
+        timer.mark('cloud_init')
+    return ssh
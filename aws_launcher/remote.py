@@ -0,0 +1,157 @@
+import os
+import select
+import time
+import uuid
+from collections import deque
+
+class StepResult:
+    """Outcome of one script step: exit status, wall time and the last lines it printed."""
+
+    def __init__(self, index, command):
+        self.index = index
+        self.command = command
+        self.exit_status = None
+        self.seconds = None
+        self.tail = deque(maxlen=20)
+
+    @property
+    def ok(self):
+        return self.exit_status == 0
+
+class RemoteScript:
+    """A list of shell steps run as one bash script over a single SSH channel.
+
+    Unlike one exec_command per step, state such as `cd` and shell variables
+    carries over between steps, and there is one round trip in total. Each
+    step is bracketed by marker lines on stdout so its exit status and
+    timing can be recovered while the output streams. A failing step stops
+    the script unless it was added with check=False.
+    """
+
+    def __init__(self):
+        self.steps = []  # (command, check)
+        self.marker = f"__step_{uuid.uuid4().hex}__"
+
+    def add(self, command, check=True):
+        self.steps.append((command, check))
+        return self
+
+    def render(self):
+        """Return the bash script text."""
+        lines = []
+        for index, (command, check) in enumerate(self.steps):
+            lines.append(f"printf '\\n{self.marker} begin {index}\\n'")
+            # Steps get /dev/null as stdin: the script itself arrives on bash's stdin.
+            lines.append(f"{{\n{command}\n}} < /dev/null")
+            lines.append("rc=$?")
+            lines.append(f"printf '\\n{self.marker} end {index} %d\\n' $rc")
+            if check:
+                lines.append("[ $rc -eq 0 ] || exit $rc")
+        lines.append("exit 0")
+        return "\n".join(lines) + "\n"
+
+    def run(self, ssh, on_output=None, timeout=None):
+        """Run the script over `ssh` (a connected paramiko.SSHClient); return [StepResult].
+
+        `on_output(stream, step_index, line)` is called for every line as it
+        arrives ("stdout" or "stderr"; step_index is None outside a step).
+        Output is never accumulated beyond each step's last few lines.
+        """
+        on_output = on_output or (lambda stream, index, line: print(line))
+        results = [StepResult(index, command) for index, (command, _) in enumerate(self.steps)]
+        current = [None]
+        started = [None]
+
+        def handle_stdout(line):
+            text, found, marker = line.partition(self.marker)
+            if text.strip():
+                emit("stdout", text)
+            if not found:
+                return
+            fields = marker.split()
+            if fields[0] == "begin":
+                current[0], started[0] = int(fields[1]), time.monotonic()
+            elif fields[0] == "end":
+                result = results[int(fields[1])]
+                result.exit_status = int(fields[2])
+                result.seconds = time.monotonic() - started[0]
+                current[0] = None
+
+        def emit(stream, line):
+            if current[0] is not None:
+                results[current[0]].tail.append(line)
+            on_output(stream, current[0], line)
+
+        channel = ssh.get_transport().open_session()
+        try:
+            channel.exec_command("bash -s")
+            channel.sendall(self.render().encode())
+            channel.shutdown_write()
+            readers = {"stdout": LineReader(handle_stdout), "stderr": LineReader(lambda line: emit("stderr", line))}
+            deadline = time.monotonic() + timeout if timeout else None
+            while True:
+                while channel.recv_ready():
+                    readers["stdout"].feed(channel.recv(32768))
+                while channel.recv_stderr_ready():
+                    readers["stderr"].feed(channel.recv_stderr(32768))
+                if channel.exit_status_ready() and not channel.recv_ready() and not channel.recv_stderr_ready():
+                    break
+                if deadline is not None and time.monotonic() > deadline:
+                    raise TimeoutError(f"Remote script did not finish within {timeout}s")
+                select.select([channel], [], [], 1.0)
+            for reader in readers.values():
+                reader.close()
+            status = channel.recv_exit_status()
+            if current[0] is not None:
+                # The shell died inside a step (killed, `exit` in the command, ...)
+                result = results[current[0]]
+                result.exit_status = status if status != 0 else -1
+                result.seconds = time.monotonic() - started[0]
+        finally:
+            channel.close()
+        return results
+
+class LineReader:
+    """Splits a byte stream into decoded lines and hands each to a callback."""
+
+    def __init__(self, on_line):
+        self.on_line = on_line
+        self.buffer = b""
+
+    def feed(self, data):
+        self.buffer += data
+        *lines, self.buffer = self.buffer.split(b"\n")
+        for line in lines:
+            self.on_line(line.decode(errors="replace").rstrip("\r"))
+
+    def close(self):
+        if self.buffer:
+            self.on_line(self.buffer.decode(errors="replace"))
+            self.buffer = b""
+
+def upload(ssh, local_path, remote_path, mode=None):
+    """Copy a file to the host over SFTP; returns the number of bytes sent.
+
+    The file is written next to `remote_path` and renamed into place, so a
+    half-finished upload never replaces a working file.
+    """
+    partial_path = f"{remote_path}.part"
+    sftp = ssh.open_sftp()
+    try:
+        sftp.put(local_path, partial_path)
+        if mode is not None:
+            sftp.chmod(partial_path, mode)
+        sftp.posix_rename(partial_path, remote_path)
+    finally:
+        sftp.close()
+    return os.path.getsize(local_path)
+
+def print_step_table(results, host=""):
+    """Print one line per step that ran: status, time and the command's first line."""
+    prefix = f"{host} " if host else ""
+    for result in results:
+        if result.exit_status is None:
+            continue
+        status = "ok" if result.ok else f"exit {result.exit_status}"
+        command = result.command.strip().splitlines()[0][:70]
+        print(f"{prefix}[{result.index:>2}] {status:<8}{result.seconds:>7.1f}s  {command}")
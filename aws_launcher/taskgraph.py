@@ -0,0 +1,84 @@
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+class TaskGraphError(Exception):
+    """A step failed; `results` holds the steps that finished, for cleanup."""
+
+    def __init__(self, step, error, results):
+        super().__init__(f"Step '{step}' failed: {error}")
+        self.step = step
+        self.error = error
+        self.results = results
+
+class TaskGraph:
+    """Runs named steps on a thread pool as soon as the steps they depend on finish.
+
+    Each step is called with the results of its dependencies as positional
+    arguments, in the order they were listed. If a step raises, no new steps
+    are started, the running ones are allowed to finish, and TaskGraphError
+    is raised with the results gathered so far.
+    """
+
+    def __init__(self, max_workers=8):
+        self.max_workers = max_workers
+        self.steps = {}
+        self.timings = {}  # step -> (start offset, duration) in seconds
+        self.total_time = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, name, func, deps=()):
+        """Register a step; dependencies must already be registered."""
+        if name in self.steps:
+            raise ValueError(f"Duplicate step: {name}")
+        for dep in deps:
+            if dep not in self.steps:
+                raise ValueError(f"Step '{name}' depends on unknown step '{dep}'")
+        self.steps[name] = (func, tuple(deps))
+        return name
+
+    def _timed(self, name, func, args, started):
+        step_started = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            finished = time.perf_counter()
+            with self._lock:
+                self.timings[name] = (step_started - started, finished - step_started)
+
+    def run(self):
+        """Run every step and return {step: result}."""
+        results = {}
+        pending = dict(self.steps)
+        running = {}
+        failure = None
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                if failure is None:
+                    for name, (func, deps) in list(pending.items()):
+                        if all(dep in results for dep in deps):
+                            args = [results[dep] for dep in deps]
+                            running[executor.submit(self._timed, name, func, args, started)] = name
+                            del pending[name]
+                elif not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except Exception as e:
+                        if failure is None:
+                            failure = (name, e)
+        self.total_time = time.perf_counter() - started
+        if failure is not None:
+            raise TaskGraphError(failure[0], failure[1], results)
+        return results
+
+    def print_timings(self):
+        """Print when each step started and how long it took, in start order."""
+        print(f"{'Step':<20}{'Start (s)':>10}{'Time (s)':>10}")
+        for name, (offset, duration) in sorted(self.timings.items(), key=lambda item: item[1][0]):
+            print(f"{name:<20}{offset:>10.2f}{duration:>10.2f}")
+        print(f"{'Total':<20}{'':>10}{self.total_time:>10.2f}")
@@ -0,0 +1,139 @@
+"""Tests for provision() and the cleanup path of deploy_app, against moto's in-memory EC2.
+
+    pip install -r aws_launcher/requirements-dev.txt && python -m pytest aws_launcher
+"""
+import builtins
+import importlib
+import os
+import sys
+
+import pytest
+from botocore.exceptions import WaiterError
+from moto import mock_aws
+
+FAKE_CREDENTIALS = "[default]\naws_access_key_id = testing\naws_secret_access_key = testing\n"
+
+@pytest.fixture
+def deploy_app(tmp_path, monkeypatch):
+    """deploy_app imported under moto, run from a scratch directory with fake credentials.
+
+    deploy_app reads aws_launcher/credentials.txt relative to the working
+    directory when it is imported, and writes key files there.
+    """
+    (tmp_path / 'aws_launcher').mkdir()
+    (tmp_path / 'aws_launcher' / 'credentials.txt').write_text(FAKE_CREDENTIALS)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(os.path.dirname(os.path.abspath(__file__)))
+    with mock_aws():
+        sys.modules.pop('deploy_app', None)
+        module = importlib.import_module('deploy_app')
+        monkeypatch.setattr(module, 'build_artifact', lambda force_build=False: 'artifact')  # No PyInstaller run
+        monkeypatch.setattr(module, 'check_build_platform', lambda: 'local')
+        monkeypatch.setattr(module, 'WAITER_DELAY', 0)
+        yield module
+    sys.modules.pop('deploy_app', None)
+
+def finished_before(graph, dep, step):
+    """Whether `dep` had finished when `step` started, per the graph's timings."""
+    dep_start, dep_time = graph.timings[dep]
+    return dep_start + dep_time <= graph.timings[step][0]
+
+def test_provision_builds_a_reachable_network(deploy_app):
+    graph = deploy_app.provision(count=2)
+    resources = graph.run()
+    ec2 = deploy_app.ec2_client
+
+    subnet = ec2.describe_subnets(SubnetIds=[resources['subnet']])['Subnets'][0]
+    assert subnet['VpcId'] == resources['vpc']
+    assert subnet['MapPublicIpOnLaunch']
+    route_table = ec2.describe_route_tables(RouteTableIds=[resources['route_table']])['RouteTables'][0]
+    assert resources['igw'] in [route.get('GatewayId') for route in route_table['Routes']]
+    assert [a.get('SubnetId') for a in route_table['Associations']] == [resources['subnet']]
+    group = ec2.describe_security_groups(GroupIds=[resources['security_group']])['SecurityGroups'][0]
+    assert group['VpcId'] == resources['vpc']
+
+    instances = resources['instances']
+    assert len(instances) == 2
+    described = ec2.describe_instances(InstanceIds=[instance_id for instance_id, _, _ in instances])
+    for reservation in described['Reservations']:
+        for instance in reservation['Instances']:
+            assert instance['SubnetId'] == resources['subnet']
+            assert instance['KeyName'] == resources['key_pair']
+            assert instance['State']['Name'] == 'running'
+    assert os.path.exists(f"{resources['key_pair']}.pem")
+
+def test_provision_runs_steps_after_their_dependencies(deploy_app):
+    graph = deploy_app.provision()
+    graph.run()
+
+    for step, deps in graph.steps.items():
+        for dep in deps[1]:
+            assert finished_before(graph, dep, step), f"{step} started before {dep} finished"
+    # Steps without a common dependency don't wait for each other
+    first = min(offset for offset, _ in graph.timings.values())
+    for step in ('artifact', 'key_pair', 'ami', 'vpc'):
+        assert not graph.steps[step][1]
+        assert graph.timings[step][0] - first < 0.5
+
+def test_failed_step_keeps_results_for_cleanup(deploy_app, monkeypatch):
+    def fail(vpc_id):
+        raise Exception("security group quota exceeded")
+
+    monkeypatch.setattr(deploy_app, 'create_security_group', fail)
+    graph = deploy_app.provision()
+    with pytest.raises(deploy_app.TaskGraphError) as raised:
+        graph.run()
+
+    assert raised.value.step == 'security_group'
+    results = raised.value.results
+    assert 'instances' not in results
+    assert {'vpc', 'key_pair'} <= set(results)
+
+def test_main_cleans_up_after_a_failure(deploy_app, monkeypatch):
+    ec2 = deploy_app.ec2_client
+    vpcs_before = {vpc['VpcId'] for vpc in ec2.describe_vpcs()['Vpcs']}
+
+    def fail(*args):
+        raise Exception("route table limit reached")
+
+    monkeypatch.setattr(deploy_app, 'create_route_table', fail)
+    monkeypatch.setattr(builtins, 'input', lambda prompt: 'y')
+    deploy_app.main([])
+
+    assert {vpc['VpcId'] for vpc in ec2.describe_vpcs()['Vpcs']} == vpcs_before
+    assert ec2.describe_key_pairs()['KeyPairs'] == []
+    assert not [name for name in os.listdir('.') if name.endswith('.pem')]
+    groups = ec2.describe_security_groups()['SecurityGroups']
+    assert all(group['GroupName'] == 'default' for group in groups)
+
+def test_main_terminates_instances_when_the_launch_wait_fails(deploy_app, monkeypatch):
+    ec2 = deploy_app.ec2_client
+    get_waiter = ec2.get_waiter
+
+    class StuckWaiter:
+        def wait(self, **kwargs):
+            raise WaiterError('InstanceRunning', 'Max attempts exceeded', {})
+
+    monkeypatch.setattr(ec2, 'get_waiter', lambda name: StuckWaiter() if name == 'instance_running' else get_waiter(name))
+    monkeypatch.setattr(builtins, 'input', lambda prompt: 'y')
+    deploy_app.main(['--count', '2'])
+
+    states = [instance['State']['Name'] for reservation in ec2.describe_instances()['Reservations']
+              for instance in reservation['Instances']]
+    assert len(states) == 2
+    assert set(states) == {'terminated'}
+
+def test_count_must_be_positive(deploy_app):
+    with pytest.raises(SystemExit):
+        deploy_app.main(['--count', '0'])
+
+def test_main_stops_before_creating_resources_when_it_cannot_build(deploy_app, monkeypatch):
+    def cannot_build():
+        raise deploy_app.ArtifactBuildError("no docker")
+
+    monkeypatch.setattr(deploy_app, 'check_build_platform', cannot_build)
+    with pytest.raises(SystemExit):
+        deploy_app.main([])
+    ec2 = deploy_app.ec2_client
+    assert ec2.describe_key_pairs()['KeyPairs'] == []
+    assert ec2.describe_instances()['Reservations'] == []
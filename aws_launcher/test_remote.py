@@ -0,0 +1,160 @@
+"""Tests for RemoteScript and LineReader, with a fake SSH channel in place of paramiko's.
+
+    python -m pytest aws_launcher/test_remote.py
+"""
+import os
+import subprocess
+
+import pytest
+
+from remote import LineReader, RemoteScript
+
+class FakeChannel:
+    """Plays back scripted (stream, bytes) reads, like a paramiko Channel running `bash -s`.
+
+    With `run_bash`, the script sent to the channel really runs in a local
+    bash and its stdout is played back `chunk_size` bytes per read, so
+    marker lines arrive split across reads. `status=None` never exits.
+    """
+
+    def __init__(self, events=(), status=0, run_bash=False, chunk_size=7):
+        self.events = list(events)
+        self.status = status
+        self.run_bash = run_bash
+        self.chunk_size = chunk_size
+        self.command = None
+        self.script = b""
+        self.closed = False
+        self._read_fd, self._write_fd = os.pipe()
+        os.write(self._write_fd, b"x")  # Always readable, so select() never waits
+
+    def exec_command(self, command):
+        self.command = command
+
+    def sendall(self, data):
+        self.script += data
+
+    def shutdown_write(self):
+        if self.run_bash:
+            proc = subprocess.run(["bash", "-s"], input=self.script, capture_output=True)
+            out = proc.stdout
+            self.events = [("stdout", out[i:i + self.chunk_size]) for i in range(0, len(out), self.chunk_size)]
+            if proc.stderr:
+                self.events.append(("stderr", proc.stderr))
+            self.status = proc.returncode
+
+    def _next(self, stream):
+        return bool(self.events) and self.events[0][0] == stream
+
+    def recv_ready(self):
+        return self._next("stdout")
+
+    def recv(self, size):
+        return self.events.pop(0)[1]
+
+    def recv_stderr_ready(self):
+        return self._next("stderr")
+
+    def recv_stderr(self, size):
+        return self.events.pop(0)[1]
+
+    def exit_status_ready(self):
+        return not self.events and self.status is not None
+
+    def recv_exit_status(self):
+        return self.status
+
+    def fileno(self):
+        return self._read_fd
+
+    def close(self):
+        if not self.closed:
+            os.close(self._read_fd)
+            os.close(self._write_fd)
+            self.closed = True
+
+class FakeTransport:
+    def __init__(self, channel):
+        self.channel = channel
+
+    def open_session(self):
+        return self.channel
+
+class FakeSSH:
+    def __init__(self, channel):
+        self.transport = FakeTransport(channel)
+
+    def get_transport(self):
+        return self.transport
+
+def run(script, channel, **kwargs):
+    output = []
+    results = script.run(FakeSSH(channel), on_output=lambda *line: output.append(line), **kwargs)
+    return results, output
+
+def test_line_reader_joins_lines_split_across_reads():
+    lines = []
+    reader = LineReader(lines.append)
+    for chunk in (b"fir", b"st\r\nsec", b"ond\nthi", b"rd"):
+        reader.feed(chunk)
+    assert lines == ["first", "second"]
+    reader.close()
+    assert lines == ["first", "second", "third"]
+
+def test_line_reader_decodes_characters_split_across_reads():
+    lines = []
+    reader = LineReader(lines.append)
+    encoded = "Pokémon\n".encode()
+    split = encoded.index(b"\xa9")  # Inside the two bytes of "é"
+    reader.feed(encoded[:split])
+    reader.feed(encoded[split:])
+    assert lines == ["Pokémon"]
+
+def test_markers_split_across_reads_give_each_step_its_status_and_output():
+    script = RemoteScript().add("echo one").add("echo two; echo three")
+    channel = FakeChannel(run_bash=True, chunk_size=5)
+    results, output = run(script, channel)
+
+    assert channel.command == "bash -s"
+    assert channel.closed
+    assert [r.exit_status for r in results] == [0, 0]
+    assert [list(r.tail) for r in results] == [["one"], ["two", "three"]]
+    assert all(r.seconds is not None for r in results)
+    assert output == [("stdout", 0, "one"), ("stdout", 1, "two"), ("stdout", 1, "three")]
+
+def test_failed_checked_step_stops_the_script():
+    script = RemoteScript().add("true").add("exit_code() { return 3; }; exit_code").add("echo never")
+    results, output = run(script, FakeChannel(run_bash=True))
+
+    assert [r.exit_status for r in results] == [0, 3, None]
+    assert not results[1].ok
+    assert ("stdout", 2, "never") not in output
+
+def test_unchecked_step_failure_does_not_stop_the_script():
+    script = RemoteScript().add("false", check=False).add("echo after")
+    results, _ = run(script, FakeChannel(run_bash=True))
+    assert [r.exit_status for r in results] == [1, 0]
+
+def test_shell_exiting_inside_a_step_fails_that_step():
+    script = RemoteScript().add("echo started; exit 7").add("echo never")
+    results, _ = run(script, FakeChannel(run_bash=True))
+    assert [r.exit_status for r in results] == [7, None]
+    assert list(results[0].tail) == ["started"]
+
+def test_stderr_is_attributed_to_the_running_step():
+    script = RemoteScript().add("build")
+    marker = script.marker.encode()
+    channel = FakeChannel([
+        ("stdout", b"\n" + marker + b" begin 0\n"),
+        ("stderr", b"warning: slow\n"),
+        ("stdout", b"done\n\n" + marker + b" end 0 0\n")
+    ])
+    results, output = run(script, channel)
+    assert output == [("stderr", 0, "warning: slow"), ("stdout", 0, "done")]
+    assert list(results[0].tail) == ["warning: slow", "done"]
+
+def test_script_that_never_exits_times_out():
+    channel = FakeChannel(status=None)
+    with pytest.raises(TimeoutError):
+        run(RemoteScript().add("sleep 1000"), channel, timeout=0.2)
+    assert channel.closed
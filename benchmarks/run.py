@@ -0,0 +1,242 @@
+"""Benchmark the pokemon_game draw path against a local PokeAPI stub.
+
+    python -m benchmarks.run --sizes 10,1000,100000 --latency-ms 20 --output results.json
+
+Results (latency distribution, allocations and file I/O bytes per
+operation) are written as JSON so runs can be compared across versions.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+try:
+    from .stub_server import start_stub
+    from .synthetic import generate_collection, fresh_names, synthetic_pokemon
+except ImportError:
+    from stub_server import start_stub
+    from synthetic import generate_collection, fresh_names, synthetic_pokemon
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_SIZES = [10, 100, 1000, 10000, 100000]
+
+def io_counters() -> Dict[str, int]:
+    """Bytes read/written by this process so far (Linux /proc), or zeros elsewhere."""
+    counters = {"rchar": 0, "wchar": 0}
+    try:
+        with open("/proc/self/io") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in counters:
+                    counters[key] = int(value)
+    except OSError:
+        pass
+    return counters
+
+def summarize(samples: List[float]) -> Dict:
+    ordered = sorted(samples)
+    def pct(p: float) -> float:
+        return ordered[max(0, min(len(ordered) - 1, round(p / 100 * len(ordered)) - 1))]
+    return {
+        "min": ordered[0], "p50": pct(50), "p90": pct(90), "p99": pct(99),
+        "max": ordered[-1], "mean": statistics.fmean(ordered)
+    }
+
+def measure(name: str, op: Callable[[int], None], samples: int, alloc_samples: int,
+            setup: Optional[Callable[[int], None]] = None, **labels) -> Dict:
+    """Time `op(i)` for distinct i, then re-run a few calls under tracemalloc.
+
+    `setup(i)` runs before each call, outside the measured window.
+    """
+    latencies, read, written = [], [], []
+    for i in range(samples):
+        if setup:
+            setup(i)
+        io_before = io_counters()
+        started = time.perf_counter()
+        op(i)
+        latencies.append(time.perf_counter() - started)
+        io_after = io_counters()
+        read.append(io_after["rchar"] - io_before["rchar"])
+        written.append(io_after["wchar"] - io_before["wchar"])
+
+    allocated, peaks = [], []
+    tracemalloc.start()
+    for i in range(samples, samples + alloc_samples):
+        if setup:
+            setup(i)
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        op(i)
+        current, peak = tracemalloc.get_traced_memory()
+        allocated.append(current - before)
+        peaks.append(peak - before)
+    tracemalloc.stop()
+
+    result = {
+        "benchmark": name,
+        **labels,
+        "samples": samples,
+        "latency_ms": {k: round(v * 1000, 4) for k, v in summarize(latencies).items()},
+        "io_bytes_per_op": {"read": statistics.fmean(read), "written": statistics.fmean(written)}
+    }
+    if alloc_samples:
+        result["alloc_bytes_per_op"] = {"retained": statistics.fmean(allocated), "peak": statistics.fmean(peaks)}
+    logging.warning(f"{name} {labels}: p50 {result['latency_ms']['p50']} ms")
+    return result
+
+class ScriptedEngine:
+    """Stands in for DrawEngine so each draw hits a chosen name."""
+
+    def __init__(self, names: List[str]):
+        self.names = names
+        self.next = 0
+
+    def draw(self, n: int = 1) -> List[str]:
+        drawn = self.names[self.next:self.next + n]
+        self.next += n
+        return drawn
+
+    def mark_owned(self, name: str) -> None:
+        pass
+
+def git_version() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_benchmarks(base_url: str, sizes: List[int], backends: List[str], samples: int, alloc_samples: int) -> List[Dict]:
+    # Imported here so POKEAPI_BASE (read at import time) already points at the stub.
+    from pokemon_game import api
+    from pokemon_game.cache import ResponseCache
+    from pokemon_game.collection import Collection
+    from pokemon_game.main import draw_pokemon
+    from pokemon_game.storage import BACKENDS
+
+    total = samples + alloc_samples
+    results = []
+    caches = []
+
+    def new_cache(path: str, **kwargs) -> ResponseCache:
+        cache = ResponseCache(path, flush_delay=None, **kwargs)  # Timed flushes would skew the I/O figures
+        caches.append(cache)
+        return cache
+
+    def cold_list(i: int) -> None:
+        api._pokemon_list_cache = None
+        api.response_cache = new_cache(f"list-cache-{i}.json")
+
+    results.append(measure("get_pokemon_list", lambda i: api.get_pokemon_list(), samples, alloc_samples,
+                           setup=cold_list, cache="cold"))
+    results.append(measure("get_pokemon_list", lambda i: api.get_pokemon_list(), samples, alloc_samples,
+                           cache="warm"))
+
+    api.response_cache = new_cache("details-cache.json", max_entries=10 * total)
+    cold_names = fresh_names(total, 0)
+    results.append(measure("get_pokemon_details", lambda i: api.get_pokemon_details(cold_names[i]),
+                           samples, alloc_samples, cache="cold"))
+    results.append(measure("get_pokemon_details", lambda i: api.get_pokemon_details(cold_names[0]),
+                           samples, alloc_samples, cache="warm"))
+
+    for backend in backends:
+        for size in sizes:
+            data = generate_collection(size)
+            path = f"{backend}-{size}"
+
+            def new_storage():
+                if backend == "sqlite":
+                    return BACKENDS[backend](path=f"{path}.db")
+                return BACKENDS[backend](path=f"{path}.json")
+
+            storage = new_storage()
+            storage.initialize()
+            storage.append_many(data["pokemon"])
+            if hasattr(storage, "compact"):
+                storage.compact()
+
+            # The pre-Collection pattern: append one Pokémon, then save the whole collection.
+            loaded = storage.load()
+
+            def save_one_more(i: int) -> None:
+                loaded["pokemon"].append(synthetic_pokemon(size + 1 + i))
+                storage.save(loaded)
+
+            results.append(measure("save_pokemon_collection", save_one_more, samples, alloc_samples,
+                                   backend=backend, collection_size=size))
+
+            # Draw step of run_game() on a collection loaded once, new vs duplicate draws.
+            logging.disable(logging.INFO)
+            api.response_cache = new_cache(f"{path}-cache.json", max_entries=10 * total)
+            collection = Collection.load(storage=new_storage())
+            new_engine = ScriptedEngine(fresh_names(total, size + total))
+            results.append(measure("draw_pokemon", lambda i: draw_pokemon(collection, new_engine),
+                                   samples, alloc_samples, backend=backend, collection_size=size, draw="new"))
+            owned_engine = ScriptedEngine([p["name"] for p in data["pokemon"][:total]] * total)
+            results.append(measure("draw_pokemon", lambda i: draw_pokemon(collection, owned_engine),
+                                   samples, alloc_samples, backend=backend, collection_size=size, draw="duplicate"))
+            logging.disable(logging.NOTSET)
+
+    # Flush now, while the cwd is still the scratch directory; the atexit
+    # flush would otherwise write the cache files wherever the run started.
+    for cache in caches:
+        cache.flush()
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the pokemon_game draw path against a local PokeAPI stub.")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated collection sizes (up to 1000000)")
+    parser.add_argument("--backends", default="json,journal,sqlite", help="comma-separated storage backends")
+    parser.add_argument("--samples", type=int, default=20, help="timed calls per benchmark")
+    parser.add_argument("--alloc-samples", type=int, default=3, help="extra calls traced for allocations")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="stub response delay")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of stub responses that are 503")
+    parser.add_argument("--species", type=int, default=1302, help="species served by the stub list endpoint")
+    parser.add_argument("--output", help="write JSON results here instead of stdout")
+    args = parser.parse_args()
+
+    base_url, stop_stub = start_stub(args.species, args.latency_ms, args.error_rate)
+    os.environ["POKEAPI_BASE"] = base_url
+    sys.path.insert(0, str(REPO_ROOT))
+    started = time.time()
+    try:
+        with tempfile.TemporaryDirectory(prefix="pokemon-bench-") as workdir:
+            cwd = os.getcwd()
+            os.chdir(workdir)
+            try:
+                results = run_benchmarks(base_url, [int(s) for s in args.sizes.split(",")],
+                                         args.backends.split(","), args.samples, args.alloc_samples)
+            finally:
+                os.chdir(cwd)
+    finally:
+        stop_stub()
+
+    report = {
+        "meta": {
+            "version": git_version(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "started_at": int(started),
+            "stub": {"latency_ms": args.latency_ms, "error_rate": args.error_rate, "species": args.species}
+        },
+        "results": results
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output)
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import json
+import multiprocessing
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qs
+
+try:
+    from .synthetic import TYPES, species_name, species_index
+except ImportError:
+    from synthetic import TYPES, species_name, species_index
+
+API_PREFIX = "/api/v2"
+
+def pokemon_details(index: int) -> Dict:
+    """Deterministic /pokemon/<name> body in PokeAPI's shape."""
+    rng = random.Random(index)
+    types = rng.sample(TYPES, rng.choice((1, 2)))
+    return {
+        "name": species_name(index),
+        "id": index,
+        "height": rng.randint(1, 200),
+        "types": [{"slot": slot + 1, "type": {"name": t, "url": ""}} for slot, t in enumerate(types)]
+    }
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Serves /pokemon?limit=N and /pokemon/<name or id> like PokeAPI."""
+
+    protocol_version = "HTTP/1.1"  # Keep-alive, so the pooled client is exercised as in production
+    disable_nagle_algorithm = True  # Headers and body go out in separate writes
+
+    def do_GET(self):
+        server = self.server
+        if server.latency:
+            time.sleep(server.latency)
+        if server.error_rate and random.random() < server.error_rate:
+            self._send(503, {"detail": "stub error"}, {"Retry-After": "0"})
+            return
+        path, _, query = self.path.partition("?")
+        if path == f"{API_PREFIX}/pokemon":
+            limit = int(parse_qs(query).get("limit", ["20"])[0])
+            count = min(limit, server.species)
+            self._send(200, {
+                "count": server.species,
+                "results": [{"name": species_name(i), "url": f"{API_PREFIX}/pokemon/{i}/"} for i in range(1, count + 1)]
+            })
+        elif path.startswith(f"{API_PREFIX}/pokemon/"):
+            key = path.rstrip("/").rsplit("/", 1)[1]
+            index = int(key) if key.isdigit() else species_index(key)
+            if index is None or index < 1:
+                self._send(404, {"detail": "Not found."})
+            else:
+                self._send(200, pokemon_details(index))
+        else:
+            self._send(404, {"detail": "Not found."})
+
+    def _send(self, status: int, body: Dict, headers: Optional[Dict] = None) -> None:
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, species: int = 1302, latency_ms: float = 0.0, error_rate: float = 0.0):
+        super().__init__(("127.0.0.1", port), StubHandler)
+        self.species = species
+        self.latency = latency_ms / 1000
+        self.error_rate = error_rate
+
+def _serve(ready, species: int, latency_ms: float, error_rate: float) -> None:
+    server = StubServer(0, species, latency_ms, error_rate)
+    ready.put(server.server_address[1])
+    server.serve_forever()
+
+def start_stub(species: int = 1302, latency_ms: float = 0.0, error_rate: float = 0.0) -> Tuple[str, Callable[[], None]]:
+    """Run the stub in a child process; returns its base URL and a stop function.
+
+    A separate process keeps the stub's work out of the benchmarked
+    process's CPU time, allocations and I/O counters.
+    """
+    ready = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_serve, args=(ready, species, latency_ms, error_rate), daemon=True)
+    process.start()
+    port = ready.get(timeout=10)
+
+    def stop() -> None:
+        process.terminate()
+        process.join()
+
+    return f"http://127.0.0.1:{port}{API_PREFIX}", stop
@@ -0,0 +1,32 @@
+import random
+from typing import Dict, List, Optional
+
+TYPES = ["normal", "fire", "water", "grass", "electric", "ice", "fighting", "poison", "ground",
+         "flying", "psychic", "bug", "rock", "ghost", "dragon", "dark", "steel", "fairy"]
+
+def species_name(index: int) -> str:
+    """Name of the synthetic species with a given id."""
+    return f"stubmon-{index}"
+
+def species_index(name: str) -> Optional[int]:
+    """Inverse of species_name(), or None for other names."""
+    prefix, _, index = name.partition("-")
+    return int(index) if prefix == "stubmon" and index.isdigit() else None
+
+def synthetic_pokemon(index: int) -> Dict:
+    """One collection entry in the game's stored shape."""
+    rng = random.Random(index)
+    return {
+        "name": species_name(index),
+        "id": index,
+        "types": rng.sample(TYPES, rng.choice((1, 2))),
+        "height": rng.randint(1, 200)
+    }
+
+def generate_collection(size: int, start: int = 1) -> Dict:
+    """A {"pokemon": [...]} collection of `size` distinct synthetic entries."""
+    return {"pokemon": [synthetic_pokemon(i) for i in range(start, start + size)]}
+
+def fresh_names(count: int, collection_size: int) -> List[str]:
+    """Names that are not in a synthetic collection of `collection_size`."""
+    return [species_name(i) for i in range(collection_size + 1, collection_size + 1 + count)]
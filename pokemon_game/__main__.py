@@ -0,0 +1,78 @@
+import argparse
+import sys
+
+import requests
+
+from .batch import batch_draw, log_report
+from .collection import Collection, initialize_json
+from .config import BACKEND_API_URL, DEFAULT_USER, HTTP_POOL_SIZE, SNAPSHOT_FILE, SQLITE_FILE, logger
+from .main import main as play
+from .snapshot import build_snapshot
+from .storage import check_user, migrate_json_to_sqlite
+from .sync import BackendSync
+
+def positive_int(value: str) -> int:
+    """argparse type for counts that must be at least 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value}")
+    return number
+
+def main() -> None:
+    """Command-line entry point: python -m pokemon_game [play|draw|snapshot|migrate|sync]."""
+    parser = argparse.ArgumentParser(prog="python -m pokemon_game", description="Pokémon Draw")
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("play", help="play the interactive game (default)")
+
+    draw = commands.add_parser("draw", help="draw Pokémon in bulk without prompting")
+    draw.add_argument("--count", type=positive_int, default=100, help="number of draws")
+    draw.add_argument("--workers", type=positive_int, default=HTTP_POOL_SIZE, help="parallel detail requests")
+    draw.add_argument("--user", default=DEFAULT_USER, help="collection owner")
+    draw.add_argument("--batch-size", type=positive_int, default=50, help="draws committed per write")
+    draw.add_argument("--quiet", action="store_true", help="don't display each drawn Pokémon")
+
+    snapshot = commands.add_parser("snapshot", help="build the offline Pokédex snapshot")
+    snapshot.add_argument("--output", default=SNAPSHOT_FILE, help="snapshot file to write")
+    snapshot.add_argument("--concurrency", type=int, default=HTTP_POOL_SIZE, help="parallel detail requests")
+    snapshot.add_argument("--force", action="store_true", help="rebuild even if the list is unchanged")
+
+    migrate = commands.add_parser("migrate", help="copy JSON collections into the SQLite backend")
+    migrate.add_argument("--db", default=SQLITE_FILE, help="SQLite database to write")
+
+    sync = commands.add_parser("sync", help="pull new Pokémon from the backend and push queued draws")
+    sync.add_argument("--url", default=BACKEND_API_URL, help="backend base URL (default: $BACKEND_API_URL)")
+    sync.add_argument("--user", default=DEFAULT_USER, help="collection owner")
+    sync.add_argument("--all", action="store_true", help="queue the whole local collection, not just new draws")
+
+    args = parser.parse_args()
+    if args.command == "draw":
+        report = batch_draw(args.count, args.workers, check_user(args.user), args.batch_size, args.quiet)
+        if not report:
+            sys.exit(1)
+        log_report(report)
+    elif args.command == "snapshot":
+        if build_snapshot(args.output, args.concurrency, args.force) is None:
+            sys.exit(1)
+    elif args.command == "migrate":
+        migrate_json_to_sqlite(args.db)
+    elif args.command == "sync":
+        if not args.url:
+            parser.error("set BACKEND_API_URL or pass --url")
+        user = check_user(args.user)
+        initialize_json(user)
+        collection = Collection.load(user)
+        backend = BackendSync(args.url, user)
+        try:
+            pulled = backend.pull(collection)
+            if args.all:
+                backend.enqueue_many(collection)
+            pushed = backend.push()
+        except (requests.RequestException, ValueError) as e:
+            logger.error(f"Sync failed: {e}")
+            sys.exit(1)
+        logger.info(f"Pulled {len(pulled)}, pushed {pushed}; {len(backend.queue)} still queued")
+    else:
+        play()
+
+if __name__ == "__main__":
+    main()
@@ -1,39 +1,108 @@
+import asyncio
 import requests
-from typing import List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Iterable, List, Dict, Optional, Union
 
 try:
-    from .config import POKEAPI_BASE, API_TIMEOUT, logger, handle_error
+    from .config import POKEAPI_BASE, POKEMON_LIST_LIMIT, HTTP_POOL_SIZE, CACHE_TTL_LIST, CACHE_TTL_DETAILS, OFFLINE_MODE, logger, handle_error
+    from .cache import response_cache
+    from .client import http_get
+    from .pokedex import load_pokedex
 except ImportError:
     # Fallback for direct execution during debugging
-    from config import POKEAPI_BASE, API_TIMEOUT, logger, handle_error
+    from config import POKEAPI_BASE, POKEMON_LIST_LIMIT, HTTP_POOL_SIZE, CACHE_TTL_LIST, CACHE_TTL_DETAILS, OFFLINE_MODE, logger, handle_error
+    from cache import response_cache
+    from client import http_get
+    from pokedex import load_pokedex
 
 _pokemon_list_cache = None
 
 def get_pokemon_list() -> List[str]:
-    """Fetch or return cached Pokémon list from PokeAPI."""
+    """Fetch or return cached Pokémon list from PokeAPI or the offline snapshot."""
     global _pokemon_list_cache
+    if OFFLINE_MODE:
+        pokedex = load_pokedex()
+        return pokedex.names[:POKEMON_LIST_LIMIT] if pokedex else []  # Snapshot rows are in id order, like the API
     if _pokemon_list_cache is None:
+        cache_key = f"pokemon?limit={POKEMON_LIST_LIMIT}"
+        _pokemon_list_cache = response_cache.get(cache_key)
+        if _pokemon_list_cache is not None:
+            return _pokemon_list_cache
         try:
-            response = requests.get(f"{POKEAPI_BASE}/pokemon?limit=1000", timeout=API_TIMEOUT)
+            response = http_get(f"{POKEAPI_BASE}/pokemon?limit={POKEMON_LIST_LIMIT}")
             response.raise_for_status()
             _pokemon_list_cache = [p["name"] for p in response.json()["results"]]
+            response_cache.set(cache_key, _pokemon_list_cache, ttl=CACHE_TTL_LIST)
         except requests.RequestException as e:
             logger.error(f"Error fetching Pokémon list: {e}")
             return []
     return _pokemon_list_cache
 
-def get_pokemon_details(name: str) -> Optional[Dict]:
-    """Fetch Pokémon details from PokeAPI."""
+def _normalize_details(data: Dict) -> Dict:
+    """Reduce a PokeAPI /pokemon response to the fields the game stores."""
+    return {
+        "name": data["name"],
+        "id": data["id"],
+        "types": [t["type"]["name"] for t in data["types"]],
+        "height": data["height"]
+    }
+
+def get_pokemon_details(name: Union[str, int]) -> Optional[Dict]:
+    """Fetch Pokémon details by name or id from the snapshot, the response cache or PokeAPI."""
+    if OFFLINE_MODE:
+        pokedex = load_pokedex()
+        pokemon = pokedex.get(name) if pokedex else None
+        if pokemon is None:
+            logger.error(f"{name} is not in the offline Pokédex snapshot.")
+        return pokemon
+    cache_key = f"pokemon/{name}"
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return cached
     try:
-        response = requests.get(f"{POKEAPI_BASE}/pokemon/{name}", timeout=API_TIMEOUT)
+        response = http_get(f"{POKEAPI_BASE}/pokemon/{name}")
         response.raise_for_status()
-        data = response.json()
-        return {
-            "name": data["name"],
-            "id": data["id"],
-            "types": [t["type"]["name"] for t in data["types"]],
-            "height": data["height"]
-        }
+        pokemon = _normalize_details(response.json())
+        response_cache.set(cache_key, pokemon, ttl=CACHE_TTL_DETAILS)
+        return pokemon
     except requests.RequestException as e:
         logger.error(f"Error fetching details for {name}: {e}")
-        return None
\ No newline at end of file
+        return None
+
+async def fetch_details_many(names: Iterable[str], concurrency: int = HTTP_POOL_SIZE) -> AsyncIterator[Dict]:
+    """Fetch details for many Pokémon at once, yielding each as it completes.
+
+    At most `concurrency` requests are in flight, capped at HTTP_POOL_SIZE
+    so every request can reuse a pooled connection; each one goes through
+    get_pokemon_details(), so the response cache and the pooled session are
+    shared with the synchronous path. Names that fail to load are logged and
+    skipped.
+    """
+    concurrency = max(1, min(concurrency, HTTP_POOL_SIZE))  # Beyond the pool, extra connections are discarded
+    semaphore = asyncio.Semaphore(concurrency)
+    loop = asyncio.get_running_loop()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        async def fetch(name: str) -> Optional[Dict]:
+            async with semaphore:
+                return await loop.run_in_executor(executor, get_pokemon_details, name)
+
+        tasks = [asyncio.ensure_future(fetch(name)) for name in names]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                pokemon = await next_done
+                if pokemon is not None:
+                    yield pokemon
+        finally:
+            for task in tasks:
+                task.cancel()
+
+def prefetch_details(names: Iterable[str], concurrency: int = HTTP_POOL_SIZE) -> List[Dict]:
+    """Blocking wrapper around fetch_details_many() for non-async callers."""
+    async def collect() -> List[Dict]:
+        return [pokemon async for pokemon in fetch_details_many(names, concurrency)]
+    return asyncio.run(collect())
+
+def get_cache_stats() -> Dict:
+    """Return response cache hit/miss counters."""
+    return response_cache.stats()
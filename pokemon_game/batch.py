@@ -0,0 +1,108 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+try:
+    from .api import get_pokemon_list, get_pokemon_details, get_cache_stats
+    from .client import record_latencies
+    from .collection import initialize_json, Collection
+    from .config import DEFAULT_USER, HTTP_POOL_SIZE, POKEAPI_BASE, logger
+    from .display import display_pokemon
+    from .draw import build_engine
+    from .sync import get_sync
+except ImportError:
+    from api import get_pokemon_list, get_pokemon_details, get_cache_stats
+    from client import record_latencies
+    from collection import initialize_json, Collection
+    from config import DEFAULT_USER, HTTP_POOL_SIZE, POKEAPI_BASE, logger
+    from display import display_pokemon
+    from draw import build_engine
+    from sync import get_sync
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of already sorted samples (0.0 when empty)."""
+    if not samples:
+        return 0.0
+    rank = max(0, min(len(samples) - 1, round(pct / 100 * len(samples)) - 1))
+    return samples[rank]
+
+def batch_draw(count: int, workers: int = HTTP_POOL_SIZE, user: str = DEFAULT_USER,
+               batch_size: int = 50, quiet: bool = False) -> Dict:
+    """Draw `count` Pokémon without prompting and return a throughput report.
+
+    Draws happen `batch_size` at a time: details for the new names of a
+    batch are fetched on `workers` threads and the batch is committed to the
+    collection in one write.
+    """
+    if count < 1 or batch_size < 1 or workers < 1:
+        raise ValueError("count, batch_size and workers must be positive")
+    initialize_json(user)
+    pokemon_list = get_pokemon_list()
+    if not pokemon_list:
+        logger.error("Failed to fetch Pokémon list. Try again later.")
+        return {}
+    collection = Collection.load(user)
+    engine = build_engine(pokemon_list, collection)
+    sync = get_sync(user)
+    if sync is not None:
+        sync.start()
+    added = duplicates = failed = 0
+    started = time.perf_counter()
+
+    # Only PokeAPI requests count: the backend sync shares the HTTP client
+    with record_latencies(POKEAPI_BASE) as latencies, ThreadPoolExecutor(max_workers=workers) as executor:
+        for done in range(0, count, batch_size):
+            drawn = engine.draw(min(batch_size, count - done))
+            missing = list(dict.fromkeys(name for name in drawn if not collection.contains(name)))
+            details = {p["name"]: p for p in executor.map(get_pokemon_details, missing) if p}
+            new = collection.add_many(details.values())
+            if sync is not None:
+                sync.enqueue_many(new)
+            for name in details:
+                engine.mark_owned(name)
+            failed += len(missing) - len(details)
+            for name in drawn:
+                pokemon = collection.get(name)
+                if pokemon is None:
+                    continue
+                if name in details:
+                    added += 1
+                    del details[name]
+                else:
+                    duplicates += 1
+                if not quiet:
+                    display_pokemon(pokemon)
+
+    elapsed = time.perf_counter() - started
+    if sync is not None:
+        sync.stop()
+    latencies = sorted(latencies)
+    return {
+        "user": user,
+        "draws": count,
+        "added": added,
+        "duplicates": duplicates,
+        "failed": failed,
+        "collection_size": len(collection),
+        "seconds": round(elapsed, 3),
+        "draws_per_second": round(count / elapsed, 1) if elapsed else 0.0,
+        "api_requests": len(latencies),
+        "api_latency_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 1),
+            "p90": round(percentile(latencies, 90) * 1000, 1),
+            "p99": round(percentile(latencies, 99) * 1000, 1)
+        },
+        "cache": get_cache_stats()
+    }
+
+def log_report(report: Dict) -> None:
+    """Log a batch_draw() report."""
+    latency = report["api_latency_ms"]
+    cache = report["cache"]
+    logger.info(f"Drew {report['draws']} Pokémon for {report['user']} in {report['seconds']}s "
+                f"({report['draws_per_second']} draws/sec)")
+    logger.info(f"Added {report['added']}, duplicates {report['duplicates']}, failed {report['failed']}; "
+                f"collection now has {report['collection_size']}")
+    logger.info(f"API requests: {report['api_requests']}, latency p50 {latency['p50']} ms, "
+                f"p90 {latency['p90']} ms, p99 {latency['p99']} ms")
+    logger.info(f"Cache hit rate: {cache['hit_rate']:.1%} ({cache['hits']} hits, {cache['misses']} misses)")
@@ -0,0 +1,118 @@
+import atexit
+import copy
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+try:
+    from .config import CACHE_FILE, CACHE_FLUSH_DELAY, CACHE_MAX_ENTRIES, logger
+except ImportError:
+    from config import CACHE_FILE, CACHE_FLUSH_DELAY, CACHE_MAX_ENTRIES, logger
+
+class ResponseCache:
+    """On-disk LRU cache for API responses with a TTL per entry.
+
+    Writes are saved `flush_delay` seconds after the first unsaved change
+    (None: only at exit), so a session killed by a dropped SSH connection
+    keeps what it fetched.
+    """
+
+    def __init__(self, path: str = CACHE_FILE, max_entries: int = CACHE_MAX_ENTRIES,
+                 flush_delay: Optional[float] = CACHE_FLUSH_DELAY):
+        self.path = Path(path).absolute()  # The delayed flush must not depend on the cwd at the time
+        self.max_entries = max_entries
+        self.flush_delay = flush_delay
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._loaded = False
+        self._dirty = False
+        self._flush_timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+        atexit.register(self.flush)
+
+    def _load(self) -> None:
+        """Read the cache file once, oldest entry first."""
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with self.path.open('r') as f:
+                entries = json.load(f).get("entries", [])
+            for key, entry in entries:
+                self._entries[key] = entry
+        except (json.JSONDecodeError, FileNotFoundError, AttributeError, ValueError):
+            self._entries.clear()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return a copy of a cached value, or None if it is missing or expired.
+
+        A hit only reorders the entry in memory; the new order is saved with
+        the next write rather than rewriting the file for every read.
+        """
+        with self._lock:
+            self._load()
+            entry = self._entries.get(key)
+            if entry is not None and entry["expires"] is not None and entry["expires"] < time.time():
+                del self._entries[key]
+                self._mark_dirty()
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(entry["value"])
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value; a ttl of None keeps it until it is evicted."""
+        with self._lock:
+            self._load()
+            expires = time.time() + ttl if ttl is not None else None
+            self._entries[key] = {"value": copy.deepcopy(value), "expires": expires}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._mark_dirty()
+
+    def _mark_dirty(self) -> None:
+        """Record an unsaved change and schedule a flush; call with the lock held."""
+        self._dirty = True
+        if self.flush_delay is not None and self._flush_timer is None:
+            self._flush_timer = threading.Timer(self.flush_delay, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def flush(self) -> None:
+        """Write the cache to disk if it changed since the last flush."""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._dirty:
+                return
+            tmp_path = self.path.with_name(self.path.name + ".tmp")
+            try:
+                with tmp_path.open('w') as f:
+                    json.dump({"entries": list(self._entries.items())}, f)
+                os.replace(tmp_path, self.path)
+                self._dirty = False
+            except OSError as e:
+                logger.warning(f"Could not write response cache {self.path}: {e}")
+
+    def stats(self) -> Dict:
+        """Return hit/miss counters for this process."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries)
+            }
+
+response_cache = ResponseCache()
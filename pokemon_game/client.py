@@ -0,0 +1,105 @@
+import random
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Iterator, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    from .config import (API_TIMEOUT, HTTP_POOL_SIZE, HTTP_MAX_RETRIES, HTTP_BACKOFF_BASE,
+                         HTTP_BACKOFF_MAX, logger)
+except ImportError:
+    from config import (API_TIMEOUT, HTTP_POOL_SIZE, HTTP_MAX_RETRIES, HTTP_BACKOFF_BASE,
+                        HTTP_BACKOFF_MAX, logger)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+_session = None
+_session_lock = threading.Lock()
+_recorders: Tuple[Tuple[str, List[float]], ...] = ()  # (URL prefix, samples) of active record_latencies() blocks
+_recorders_lock = threading.Lock()
+
+def get_session() -> requests.Session:
+    """Return the shared keep-alive session, creating it on first use."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+    return _session
+
+def _retry_after(response: requests.Response) -> Optional[float]:
+    """Parse a Retry-After header given either in seconds or as an HTTP date."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+def backoff(attempt: int) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(HTTP_BACKOFF_MAX, HTTP_BACKOFF_BASE * 2 ** attempt))
+
+def http_get(url: str, **kwargs) -> requests.Response:
+    """GET a URL over the pooled session, retrying 429/5xx and connection errors."""
+    return http_request("GET", url, **kwargs)
+
+def http_request(method: str, url: str, retries: int = HTTP_MAX_RETRIES, **kwargs) -> requests.Response:
+    """Send a request over the pooled session with http_get()'s retry policy.
+
+    Only use it for requests that are safe to repeat, or pass retries=0.
+    """
+    kwargs.setdefault("timeout", API_TIMEOUT)
+    for attempt in range(retries + 1):
+        last_attempt = attempt == retries
+        started = time.perf_counter()
+        try:
+            response = get_session().request(method, url, **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if last_attempt:
+                raise
+            delay = backoff(attempt)
+            logger.debug(f"{method} {url} failed ({e}); retrying in {delay:.1f}s")
+        else:
+            elapsed = time.perf_counter() - started
+            for prefix, samples in _recorders:
+                if url.startswith(prefix):
+                    samples.append(elapsed)
+            if response.status_code not in RETRY_STATUSES or last_attempt:
+                return response
+            retry_after = _retry_after(response)
+            delay = min(retry_after if retry_after is not None else backoff(attempt), HTTP_BACKOFF_MAX)
+            logger.debug(f"{method} {url} returned {response.status_code}; retrying in {delay:.1f}s")
+            response.close()
+        time.sleep(delay)
+
+@contextmanager
+def record_latencies(url_prefix: str = "") -> Iterator[List[float]]:
+    """Collect the durations (seconds) of requests to URLs starting with `url_prefix`.
+
+    Covers requests made on any thread while the block runs, so a caller
+    measures exactly its own run and not, say, the backend sync's requests.
+    """
+    global _recorders
+    recorder = (url_prefix, [])
+    with _recorders_lock:
+        _recorders = _recorders + (recorder,)
+    try:
+        yield recorder[1]
+    finally:
+        with _recorders_lock:
+            _recorders = tuple(r for r in _recorders if r is not recorder)
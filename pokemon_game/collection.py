@@ -1,34 +1,94 @@
-import json
-from pathlib import Path
-from typing import Dict
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, Optional, Union
 
 try:
-    from .config import JSON_FILE, logger, handle_error
+    from .config import DEFAULT_USER
+    from .storage import get_storage
 except ImportError:
-    from config import JSON_FILE, logger, handle_error
-
-def initialize_json() -> None:
-    """Initialize JSON file if it doesn't exist."""
-    file_path = Path(JSON_FILE)
-    if not file_path.exists():
-        try:
-            with file_path.open('w') as f:
-                json.dump({"pokemon": []}, f, indent=2)
-        except PermissionError:
-            handle_error("Cannot create pokemon_collection.json. Check permissions.")
-
-def load_pokemon_collection() -> Dict:
-    """Load Pokémon collection from JSON."""
-    try:
-        with Path(JSON_FILE).open('r') as f:
-            return json.load(f)
-    except (json.JSONDecodeError, FileNotFoundError):
-        return {"pokemon": []}
-
-def save_pokemon_collection(data: Dict) -> None:
-    """Save Pokémon collection to JSON."""
-    try:
-        with Path(JSON_FILE).open('w') as f:
-            json.dump(data, f, indent=2)
-    except PermissionError:
-        handle_error("Cannot write to pokemon_collection.json. Check permissions.")
\ No newline at end of file
+    from config import DEFAULT_USER
+    from storage import get_storage
+
+def initialize_json(user: str = DEFAULT_USER) -> None:
+    """Initialize the user's collection storage if it doesn't exist."""
+    get_storage(user).initialize()
+
+def load_pokemon_collection(user: str = DEFAULT_USER) -> Dict:
+    """Load a user's Pokémon collection from the configured storage backend."""
+    return get_storage(user).load()
+
+def save_pokemon_collection(data: Dict, user: str = DEFAULT_USER) -> None:
+    """Save a user's Pokémon collection to the configured storage backend."""
+    get_storage(user).save(data)
+
+class Collection:
+    """Pokémon collection kept in memory with indexes by name, id and type.
+
+    Load it once per session; add() updates the indexes and appends the new
+    Pokémon to the storage backend, so lookups never rescan the collection.
+    """
+
+    def __init__(self, pokemon: Iterable[Dict] = (), storage=None):
+        self.storage = storage
+        self._pokemon: List[Dict] = []
+        self._by_name: Dict[str, Dict] = {}
+        self._by_id: Dict[int, Dict] = {}
+        self._by_type: Dict[str, List[Dict]] = defaultdict(list)
+        for p in pokemon:
+            self._index(p)
+
+    @classmethod
+    def load(cls, user: str = DEFAULT_USER, storage=None) -> "Collection":
+        """Load a user's collection from storage (the configured backend by default)."""
+        storage = storage or get_storage(user)
+        return cls(storage.load()["pokemon"], storage)
+
+    def _index(self, pokemon: Dict) -> None:
+        self._pokemon.append(pokemon)
+        self._by_name[pokemon["name"]] = pokemon
+        self._by_id[pokemon["id"]] = pokemon
+        for type_name in pokemon["types"]:
+            self._by_type[type_name].append(pokemon)
+
+    def __len__(self) -> int:
+        return len(self._pokemon)
+
+    def __iter__(self) -> Iterator[Dict]:
+        return iter(self._pokemon)
+
+    def get(self, key: Union[str, int]) -> Optional[Dict]:
+        """Look up an owned Pokémon by name or id."""
+        if isinstance(key, int) or key.isdigit():
+            return self._by_id.get(int(key))
+        return self._by_name.get(key.lower())
+
+    def contains(self, key: Union[str, int]) -> bool:
+        """Check whether a Pokémon (by name or id) is owned."""
+        return self.get(key) is not None
+
+    def by_type(self, type_name: str) -> List[Dict]:
+        """Return the owned Pokémon of one type."""
+        return list(self._by_type.get(type_name, ()))
+
+    def add(self, pokemon: Dict) -> bool:
+        """Add a Pokémon and persist it; returns False if it was already owned."""
+        if pokemon["name"] in self._by_name:
+            return False
+        self._index(pokemon)
+        if self.storage is not None:
+            self.storage.append(pokemon)
+        return True
+
+    def add_many(self, pokemon: Iterable[Dict]) -> List[Dict]:
+        """Add several Pokémon, persisting the new ones in one batch; returns those added."""
+        added = []
+        for p in pokemon:
+            if p["name"] not in self._by_name:
+                self._index(p)
+                added.append(p)
+        if added and self.storage is not None:
+            self.storage.append_many(added)
+        return added
+
+    def to_dict(self) -> Dict:
+        """Return the collection in the stored {"pokemon": [...]} shape."""
+        return {"pokemon": list(self._pokemon)}
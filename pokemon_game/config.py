@@ -1,4 +1,5 @@
 import logging
+import os
 import sys
 
 # Configure logging
@@ -6,9 +7,49 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 logger = logging.getLogger(__name__)
 
 # Constants
-POKEAPI_BASE = "https://pokeapi.co/api/v2"
+POKEAPI_BASE = os.getenv("POKEAPI_BASE", "https://pokeapi.co/api/v2")  # Override to point at a mirror or local stub
 JSON_FILE = "pokemon_collection.json"
 API_TIMEOUT = 5  # Seconds for API request timeout
+POKEMON_LIST_LIMIT = 1000  # The game draws from the first N species, online and offline alike
+
+# HTTP client
+HTTP_POOL_SIZE = 10  # Keep-alive connections kept open per host
+HTTP_MAX_RETRIES = 3  # Retries on 429/5xx responses and connection errors
+HTTP_BACKOFF_BASE = 0.5  # Seconds; doubled on every retry, with full jitter
+HTTP_BACKOFF_MAX = 30  # Seconds; upper bound for a single wait, including Retry-After
+
+# Response cache
+CACHE_FILE = ".pokeapi_cache.json"
+CACHE_MAX_ENTRIES = 2048  # Least recently used entries are evicted beyond this
+CACHE_TTL_LIST = 24 * 60 * 60  # Seconds; the species list changes rarely
+CACHE_TTL_DETAILS = None  # Details never change, so they never expire
+CACHE_FLUSH_DELAY = 2.0  # Seconds after a write before the cache is saved; atexit isn't run on SIGHUP/SIGTERM
+
+# Offline snapshot (build with: python -m pokemon_game.snapshot)
+SNAPSHOT_FILE = "pokedex_snapshot.json"
+OFFLINE_MODE = os.getenv("POKEMON_OFFLINE", "0") == "1"  # Serve list/details only from SNAPSHOT_FILE
+
+# Collection storage
+STORAGE_BACKEND = os.getenv("POKEMON_STORAGE", "journal")  # "journal", "json" or "sqlite"
+DEFAULT_USER = os.getenv("POKEMON_USER", "default")  # Owner of JSON_FILE; other users get their own file
+SQLITE_FILE = "pokemon_collection.db"  # One database shared by all users
+JOURNAL_FSYNC = "always"  # "always", "compact" (only when compacting) or "never"
+JOURNAL_COMPACT_EVERY = 500  # Journal records folded back into JSON_FILE at a time
+
+# Draw weighting
+DRAW_UNSEEN_BOOST = 3.0  # Weight multiplier for Pokémon not yet collected; 1.0 draws uniformly
+DRAW_TIER_WEIGHTS = {"common": 1.0, "legendary": 0.1, "mythical": 0.05}  # Relative weight per rarity tier (see rarity.py)
+DRAW_TYPE_WEIGHTS = {}  # e.g. {"dragon": 0.5}; a Pokémon uses its highest type weight, default 1.0 (unknown types too)
+DRAW_SEED = int(os.environ["POKEMON_SEED"]) if os.getenv("POKEMON_SEED") else None  # Fixed seed for reproducible draws
+
+# Backend sync (off unless BACKEND_API_URL is set)
+BACKEND_API_URL = os.getenv("BACKEND_API_URL")  # e.g. http://localhost:5000, the backend-app CRUD API
+SYNC_QUEUE_FILE = ".sync_queue.jsonl"  # Drawn Pokémon not yet pushed; one JSON line each
+SYNC_STATE_FILE = ".sync_state.json"  # Pull cursor: the last backend _id seen
+SYNC_BATCH_SIZE = 100  # Pokémon per bulk request
+SYNC_INTERVAL = 5  # Seconds between background pushes while draws are queued
+SYNC_PULL_PAGE = 500  # Documents per page when pulling
+SYNC_STARTUP_TIMEOUT = 2  # Seconds for the single attempt of the pull before the game starts
 
 def handle_error(message: str, exit_code: int = 1) -> None:
     """Log error and exit program."""
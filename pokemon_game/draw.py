@@ -0,0 +1,144 @@
+import random
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+try:
+    from .config import DRAW_UNSEEN_BOOST, DRAW_TIER_WEIGHTS, DRAW_TYPE_WEIGHTS, DRAW_SEED, SNAPSHOT_FILE
+    from .pokedex import load_pokedex
+    from .rarity import rarity_index
+except ImportError:
+    from config import DRAW_UNSEEN_BOOST, DRAW_TIER_WEIGHTS, DRAW_TYPE_WEIGHTS, DRAW_SEED, SNAPSHOT_FILE
+    from pokedex import load_pokedex
+    from rarity import rarity_index
+
+class AliasTable:
+    """Walker/Vose alias table: O(n) to build, O(1) per sample."""
+
+    def __init__(self, weights: List[float]):
+        n = len(weights)
+        total = sum(weights)
+        scaled = [w * n / total for w in weights]
+        self.prob = [1.0] * n
+        self.alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] += scaled[s] - 1.0
+            (small if scaled[l] < 1.0 else large).append(l)
+
+    def sample(self, rng: random.Random) -> int:
+        """Return an index with probability proportional to its weight."""
+        i = rng.randrange(len(self.prob))
+        return i if rng.random() < self.prob[i] else self.alias[i]
+
+class DrawEngine:
+    """Weighted Pokémon draws that stay O(1) as the collection grows.
+
+    Each Pokémon's weight is its rarity tier weight times its best type
+    weight, multiplied by `unseen_boost` while it isn't owned. Pokémon with
+    equal weight share a bucket; an alias table picks the bucket and a
+    uniform pick inside it picks the Pokémon. Marking a Pokémon as owned
+    moves it between two buckets in O(1), and only the small table over
+    buckets is rebuilt.
+    """
+
+    def __init__(self, names: Iterable[str], owned: Iterable[str] = (),
+                 rarity: Optional[Dict[str, str]] = None, types: Optional[Dict[str, List[str]]] = None,
+                 tier_weights: Dict[str, float] = DRAW_TIER_WEIGHTS,
+                 type_weights: Dict[str, float] = DRAW_TYPE_WEIGHTS,
+                 unseen_boost: float = DRAW_UNSEEN_BOOST, seed: Optional[int] = DRAW_SEED):
+        self.rng = random.Random(seed)
+        self.unseen_boost = unseen_boost
+        rarity = rarity or {}
+        types = types or {}
+        owned = set(owned)
+        self._base: Dict[str, float] = {}
+        self._owned = set()
+        self._buckets: Dict[float, List[str]] = {}
+        self._position: Dict[str, int] = {}
+        for name in names:
+            if name in self._base:
+                continue
+            type_weight = max((type_weights.get(t, 1.0) for t in types.get(name, ())), default=1.0)
+            self._base[name] = tier_weights.get(rarity.get(name, "common"), 1.0) * type_weight
+            if name in owned:
+                self._owned.add(name)
+            self._bucket_add(name)
+        self._keys: List[float] = []
+        self._table = None
+
+    def __len__(self) -> int:
+        return len(self._base)
+
+    def weight(self, name: str) -> float:
+        """Current draw weight of a Pokémon."""
+        return self._base[name] * (1.0 if name in self._owned else self.unseen_boost)
+
+    def _bucket_add(self, name: str) -> None:
+        bucket = self._buckets.setdefault(self.weight(name), [])
+        self._position[name] = len(bucket)
+        bucket.append(name)
+
+    def _bucket_remove(self, name: str) -> None:
+        key = self.weight(name)
+        bucket = self._buckets[key]
+        index = self._position.pop(name)
+        last = bucket.pop()
+        if last != name:
+            bucket[index] = last
+            self._position[last] = index
+        if not bucket:
+            del self._buckets[key]
+
+    def mark_owned(self, name: str) -> None:
+        """Record that a Pokémon was collected so it loses its unseen boost."""
+        if name not in self._base or name in self._owned:
+            return
+        self._bucket_remove(name)
+        self._owned.add(name)
+        self._bucket_add(name)
+        self._table = None
+
+    def draw(self, n: int = 1) -> List[str]:
+        """Draw `n` Pokémon names (with replacement).
+
+        If every weight is 0 the draw falls back to uniform; an engine with
+        no names raises ValueError.
+        """
+        if self._table is None:
+            if not self._buckets:
+                raise ValueError("Cannot draw from an empty Pokémon list")
+            self._keys = [key for key in self._buckets if key > 0]
+            if self._keys:
+                self._table = AliasTable([key * len(self._buckets[key]) for key in self._keys])
+            else:
+                self._keys = list(self._buckets)
+                self._table = AliasTable([len(self._buckets[key]) for key in self._keys])
+        drawn = []
+        for _ in range(n):
+            bucket = self._buckets[self._keys[self._table.sample(self.rng)]]
+            drawn.append(bucket[self.rng.randrange(len(bucket))])
+        return drawn
+
+def known_types(owned: Iterable[Dict], snapshot_path: str = SNAPSHOT_FILE) -> Dict[str, List[str]]:
+    """Types of every Pokémon we have details for: the offline snapshot, if built, and the collection."""
+    types = {}
+    if Path(snapshot_path).exists():
+        pokedex = load_pokedex(snapshot_path)
+        if pokedex is not None:
+            types.update((name, pokedex.get(name)["types"]) for name in pokedex.names)
+    types.update((p["name"], p["types"]) for p in owned)
+    return types
+
+def build_engine(names: List[str], owned: Iterable[Dict], **kwargs) -> DrawEngine:
+    """DrawEngine over `names` with rarity tiers and the known types filled in.
+
+    `owned` are the collection's Pokémon. Unseen Pokémon whose types are
+    unknown (no snapshot) get a type weight of 1.0.
+    """
+    owned = list(owned)
+    return DrawEngine(names, owned=(p["name"] for p in owned), rarity=rarity_index(names),
+                      types=known_types(owned), **kwargs)
@@ -1,21 +1,56 @@
-import random
 import sys
-from typing import Dict
+from typing import Optional
+
+import requests
 
 try:
-    from .api import get_pokemon_list, get_pokemon_details
-    from .collection import initialize_json, load_pokemon_collection, save_pokemon_collection
+    from .api import get_pokemon_list, get_pokemon_details, get_cache_stats
+    from .collection import initialize_json, Collection
     from .display import display_pokemon
-    from .config import logger
+    from .draw import DrawEngine, build_engine
+    from .config import SYNC_STARTUP_TIMEOUT, logger
+    from .sync import BackendSync, get_sync
 except ImportError:
-    from api import get_pokemon_list, get_pokemon_details
-    from collection import initialize_json, load_pokemon_collection, save_pokemon_collection
+    from api import get_pokemon_list, get_pokemon_details, get_cache_stats
+    from collection import initialize_json, Collection
     from display import display_pokemon
-    from config import logger
+    from draw import DrawEngine, build_engine
+    from config import SYNC_STARTUP_TIMEOUT, logger
+    from sync import BackendSync, get_sync
+
+def draw_pokemon(collection: Collection, engine: DrawEngine, sync: Optional[BackendSync] = None) -> None:
+    """Draw one random Pokémon and add it to the collection (and the sync queue) if it's new."""
+    random_pokemon = engine.draw()[0]
+    existing_pokemon = collection.get(random_pokemon)
+
+    if existing_pokemon:
+        logger.info(f"{random_pokemon.capitalize()} is already in your collection!")
+        display_pokemon(existing_pokemon)
+    else:
+        pokemon_data = get_pokemon_details(random_pokemon)
+        if pokemon_data:
+            collection.add(pokemon_data)
+            engine.mark_owned(random_pokemon)
+            if sync is not None:
+                sync.enqueue(pokemon_data)
+            logger.info(f"Added {random_pokemon.capitalize()} to your collection!")
+            display_pokemon(pokemon_data)
+        else:
+            logger.error(f"Could not add {random_pokemon}. Try again.")
 
 def run_game() -> None:
     """Main game loop."""
     initialize_json()
+    collection = Collection.load()
+    engine: Optional[DrawEngine] = None
+    sync = get_sync()
+    if sync is not None:
+        try:
+            # One short attempt: an unreachable backend must not hold up the game
+            sync.pull(collection, timeout=SYNC_STARTUP_TIMEOUT, retries=0)
+        except (requests.RequestException, ValueError) as e:
+            logger.warning(f"Could not pull from the backend ({e}); playing with the local collection")
+        sync.start()
     logger.info("Welcome to Pokémon Draw! 🎮")
     
     while True:
@@ -27,25 +62,16 @@ def run_game() -> None:
                 logger.error("Failed to fetch Pokémon list. Try again later.")
                 continue
             
-            random_pokemon = random.choice(pokemon_list)
-            collection = load_pokemon_collection()
-            existing_pokemon = next((p for p in collection["pokemon"] if p["name"] == random_pokemon), None)
-            
-            if existing_pokemon:
-                logger.info(f"{random_pokemon.capitalize()} is already in your collection!")
-                display_pokemon(existing_pokemon)
-            else:
-                pokemon_data = get_pokemon_details(random_pokemon)
-                if pokemon_data:
-                    collection["pokemon"].append(pokemon_data)
-                    save_pokemon_collection(collection)
-                    logger.info(f"Added {random_pokemon.capitalize()} to your collection!")
-                    display_pokemon(pokemon_data)
-                else:
-                    logger.error(f"Could not add {random_pokemon}. Try again.")
+            if engine is None:
+                engine = build_engine(pokemon_list, collection)
+            draw_pokemon(collection, engine, sync)
         
         elif choice == "no":
             logger.info("\nThanks for playing! Gotta catch 'em all next time! 👋")
+            stats = get_cache_stats()
+            logger.debug(f"Response cache: {stats['hits']} hits, {stats['misses']} misses")
+            if sync is not None:
+                sync.stop()  # Unpushed draws stay queued on disk for the next session
             break
         else:
             logger.warning("Please enter 'yes' or 'no'.")
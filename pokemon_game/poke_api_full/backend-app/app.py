@@ -1,80 +1,300 @@
 # backend-app/app.py
 # Flask CRUD API for MongoDB
 
-from flask import Flask, request, jsonify
-from pymongo import MongoClient
+from flask import Flask, Response, g, request, jsonify
+from pymongo import DeleteOne, InsertOne, MongoClient, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, PyMongoError
 from bson.objectid import ObjectId
+from bson.errors import InvalidId
+from werkzeug.local import LocalProxy
+from cache import ResponseCache
+from queries import DEFAULT_PAGE_SIZE, INDEXES, NDJSON, OBSOLETE_INDEXES, name_query, next_cursor, parse_list_args, validate_new, validate_update
+from serialization import MongoJSONProvider
+from metrics import SIZE_BUCKETS, CommandTimer, Counter, Gauge, Registry, sample
+import functools
+import hashlib
 import os
+import threading
+import time
 
 app = Flask(__name__)
+app.json = MongoJSONProvider(app) # Encodes ObjectId, so documents go to jsonify() as the driver returns them
 
 # MongoDB connection
-# MONGO_URI will be set by docker-compose.yml
+# MONGO_URI will be set by docker-compose.yml; mongomock://... selects an in-memory stand-in (mongomock)
 MONGO_URI = os.getenv('MONGO_URI', 'mongodb://localhost:27017/pokeapi_db')
-client = MongoClient(MONGO_URI)
-db = client.pokeapi_db
-pokemon_collection = db.pokemon # Collection to store Pokemon data
+MONGO_POOL_SIZE = int(os.getenv('MONGO_POOL_SIZE', '50'))  # Connections per worker process
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+def create_client():
+    if MONGO_URI.startswith('mongomock://'):
+        import mongomock
+        return mongomock.MongoClient()
+    return MongoClient(MONGO_URI, maxPoolSize=MONGO_POOL_SIZE,
+                       event_listeners=[CommandTimer(mongo_duration, mongo_failures)])
+
+def get_client():
+    """Return this process's MongoClient, creating it on first use.
+
+    pymongo clients are not fork-safe, so each gunicorn worker builds its
+    own after the fork instead of inheriting one from the master.
+    """
+    global _client, _client_pid
+    if _client is None or _client_pid != os.getpid():
+        with _client_lock: # Threads of one worker share a single client
+            if _client is None or _client_pid != os.getpid():
+                client = create_client()
+                ensure_indexes(client.pokeapi_db.pokemon)
+                _client, _client_pid = client, os.getpid()
+    return _client
+
+def close_client():
+    """Close this process's MongoClient (called on worker shutdown)."""
+    global _client
+    if _client is not None and _client_pid == os.getpid():
+        _client.close()
+    _client = None
+
+pokemon_collection = LocalProxy(lambda: get_client().pokeapi_db.pokemon) # Collection to store Pokemon data
+
+# Bulk endpoints
+BULK_CHUNK_SIZE = int(os.getenv('BULK_CHUNK_SIZE', '1000'))  # Operations per bulk_write call
+BULK_MAX_ITEMS = int(os.getenv('BULK_MAX_ITEMS', '100000'))  # Items accepted per request
+DUPLICATE_KEY = 11000
+
+# Read-through cache for GET responses, cleared by every write
+response_cache = ResponseCache(
+    max_entries=int(os.getenv('RESPONSE_CACHE_SIZE', '1024')),
+    ttl=float(os.getenv('RESPONSE_CACHE_TTL', '30'))
+)
+
+# Request and MongoDB metrics, scraped at /metrics; summed over all workers
+# when PROMETHEUS_MULTIPROC_DIR is set (see gunicorn.conf.py)
+metrics = Registry(shared_dir=os.getenv('PROMETHEUS_MULTIPROC_DIR'))
+requests_total = metrics.counter('http_requests_total', 'Requests handled.', ('method', 'route', 'status'))
+request_duration = metrics.histogram('http_request_duration_seconds',
+                                     'Time to produce a response (streamed bodies: until the first byte).',
+                                     ('method', 'route'))
+requests_in_flight = metrics.gauge('http_requests_in_flight', 'Requests being handled right now.')
+request_size = metrics.histogram('http_request_size_bytes', 'Request body sizes.', ('method', 'route'), SIZE_BUCKETS)
+response_size = metrics.histogram('http_response_size_bytes', 'Response body sizes (streamed bodies excluded).',
+                                  ('method', 'route'), SIZE_BUCKETS)
+handler_errors = metrics.counter('http_handler_errors_total', 'Exceptions turned into 500 responses.',
+                                 ('route', 'exception'))
+mongo_duration = metrics.histogram('mongodb_command_duration_seconds', 'MongoDB command round trips.', ('command',))
+mongo_failures = metrics.counter('mongodb_command_failures_total', 'MongoDB commands that failed.', ('command', 'code'))
+
+def collect_cache_metrics():
+    stats = response_cache.stats()
+    return [
+        sample(Gauge, 'response_cache_entries', 'Responses currently cached.', stats['entries']),
+        sample(Counter, 'response_cache_hits_total', 'Response cache hits.', stats['hits']),
+        sample(Counter, 'response_cache_misses_total', 'Response cache misses.', stats['misses']),
+        sample(Counter, 'response_cache_evictions_total', 'Responses evicted to stay under the size limit.', stats['evictions']),
+        sample(Counter, 'response_cache_invalidations_total', 'Cache clears caused by writes.', stats['invalidations'])
+    ]
+
+metrics.collectors.append(collect_cache_metrics)
+
+def route_label():
+    """The matched URL rule (/pokemon/<id>), so ids don't create a series each."""
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+def server_error(e):
+    """Log and count an unexpected handler error; return the API's 500 response."""
+    handler_errors.inc(route_label(), type(e).__name__)
+    app.logger.exception(f"{request.method} {request.path} failed")
+    return jsonify({"error": str(e)}), 500
+
+def ensure_indexes(collection):
+    """Create the indexes the API relies on; a no-op when they already exist."""
+    try:
+        existing = collection.index_information()
+        for name in OBSOLETE_INDEXES:
+            if name in existing:
+                collection.drop_index(name)
+        for keys, options in INDEXES:
+            collection.create_index(keys, **options)
+    except PyMongoError as e:
+        app.logger.warning(f"Could not create indexes: {e}")
+
+def cached_get(view):
+    """Serve a GET view from response_cache, with a strong ETag and If-None-Match support."""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if request.accept_mimetypes.best == NDJSON:
+            return view(*args, **kwargs)  # Streamed responses are never cached
+        key = request.full_path
+        cached = response_cache.get(key)
+        if cached is not None:
+            body, status, headers = cached
+            response = app.response_class(body, status=status, headers=headers)
+            response.headers['X-Cache'] = 'HIT'
+        else:
+            generation = response_cache.generation
+            response = app.make_response(view(*args, **kwargs))
+            if response.status_code == 200 and not response.is_streamed:
+                response.set_etag(hashlib.sha1(response.get_data()).hexdigest())
+                response_cache.set(key, (response.get_data(), response.status_code, list(response.headers)), generation)
+            response.headers['X-Cache'] = 'MISS'
+        return response.make_conditional(request)
+    return wrapper
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    requests_in_flight.inc()
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.get('request_started')
+    if started is not None:
+        route, method = route_label(), request.method
+        request_duration.observe(time.perf_counter() - started, method, route)
+        requests_total.inc(method, route, str(response.status_code))
+        request_size.observe(request.content_length or 0, method, route)
+        if not response.is_streamed:
+            response_size.observe(response.content_length or 0, method, route)
+    return response
+
+@app.teardown_request
+def stop_request_timer(exc):
+    if g.pop('request_started', None) is not None:
+        requests_in_flight.dec()
+
+@app.after_request
+def invalidate_cache_on_write(response):
+    """Drop cached reads after any request that may have changed data."""
+    if request.method in ('POST', 'PUT', 'PATCH', 'DELETE'):
+        response_cache.clear()
+    return response
 
 @app.route('/')
 def home():
     return "PokeAPI Backend is running!"
 
+@app.route('/ready')
+def ready():
+    """Readiness probe: 200 once this worker can reach MongoDB, 503 otherwise."""
+    try:
+        get_client().admin.command('ping')
+        return jsonify({"status": "ready"}), 200
+    except Exception as e:
+        return jsonify({"status": "unavailable", "error": str(e)}), 503
+
 @app.route('/pokemon_game', methods=['POST'])
 def create_pokemon():
     """Create a new Pokemon entry."""
-    data = request.json
-    if not data or 'name' not in data or 'type' not in data:
-        return jsonify({"error": "Name and type are required"}), 400
+    data = request.get_json(silent=True)
+    try:
+        validate_new(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     
-    # Ensure unique names or handle duplicates as per game logic
-    if pokemon_collection.find_one({'name': data['name']}):
-        return jsonify({"error": "Pokemon with this name already exists"}), 409
-
+    # Names are unique per owner through the owner_name_unique index, so a duplicate fails the insert itself
     try:
-        result = pokemon_collection.insert_one(data)
-        data['_id'] = str(result.inserted_id) # Convert ObjectId to string for JSON
+        pokemon_collection.insert_one(data) # Sets data['_id']
         return jsonify(data), 201
+    except DuplicateKeyError:
+        return jsonify({"error": "Pokemon with this name already exists"}), 409
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return server_error(e)
 
 @app.route('/pokemon', methods=['GET'])
+@cached_get
 def get_all_pokemon():
-    """Retrieve all Pokemon entries."""
+    """Retrieve Pokemon entries in _id order, one page at a time.
+
+    Accepts limit, after, fields and format (see queries.parse_list_args).
+    If a stream fails part way, its last line is {"error": ...}.
+    """
+    return list_pokemon({})
+
+def list_pokemon(query):
+    """Return the documents matching `query`, paged, projected or streamed per the request args."""
     try:
-        pokemon_list = []
-        for pokemon in pokemon_collection.find():
-            pokemon['_id'] = str(pokemon['_id']) # Convert ObjectId to string
-            pokemon_list.append(pokemon)
-        return jsonify(pokemon_list), 200
+        list_query = parse_list_args(request.args, query, request.accept_mimetypes.best == NDJSON)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        cursor = pokemon_collection.find(list_query.query, list_query.projection).sort('_id', 1)
+        if list_query.limit is not None:
+            cursor = cursor.limit(list_query.limit)
+        if list_query.stream:
+            route = route_label()
+
+            def generate():
+                try:
+                    for pokemon in cursor.batch_size(DEFAULT_PAGE_SIZE):
+                        yield app.json.dumps_bytes(pokemon) + b'\n'
+                except Exception as e:
+                    # The 200 status is already sent; a final error line tells the client the stream is incomplete
+                    handler_errors.inc(route, type(e).__name__)
+                    app.logger.exception(f"Streaming {route} failed")
+                    yield app.json.dumps_bytes({"error": str(e)}) + b'\n'
+            return Response(generate(), mimetype=NDJSON)
+
+        pokemon_list = list(cursor)
+        response = jsonify(pokemon_list)
+        cursor_id = next_cursor(pokemon_list, list_query.limit)
+        if cursor_id is not None:
+            response.headers['X-Next-Cursor'] = cursor_id
+        return response, 200
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return server_error(e)
+
+@app.route('/pokemon/name/<name>', methods=['GET'])
+@cached_get
+def get_pokemon_by_name(name):
+    """Retrieve a Pokemon entry by name; ?owner= picks the one of that owner."""
+    try:
+        pokemon = pokemon_collection.find_one(name_query(name, request.args))
+        if pokemon:
+            return jsonify(pokemon), 200
+        return jsonify({"message": "Pokemon not found"}), 404
+    except Exception as e:
+        return server_error(e)
+
+@app.route('/pokemon/type/<type_name>', methods=['GET'])
+@cached_get
+def get_pokemon_by_type(type_name):
+    """Retrieve Pokemon entries of one type; accepts the same paging args as GET /pokemon."""
+    return list_pokemon({'type': type_name})
 
 @app.route('/pokemon/<id>', methods=['GET'])
+@cached_get
 def get_pokemon_by_id(id):
     """Retrieve a single Pokemon entry by ID."""
     try:
         pokemon = pokemon_collection.find_one({'_id': ObjectId(id)})
         if pokemon:
-            pokemon['_id'] = str(pokemon['_id'])
             return jsonify(pokemon), 200
         return jsonify({"message": "Pokemon not found"}), 404
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return server_error(e)
 
 @app.route('/pokemon/<id>', methods=['PUT'])
 def update_pokemon(id):
     """Update an existing Pokemon entry by ID."""
-    data = request.json
-    if not data:
-        return jsonify({"error": "No data provided for update"}), 400
+    data = request.get_json(silent=True)
+    try:
+        validate_update(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     
     try:
         result = pokemon_collection.update_one({'_id': ObjectId(id)}, {'$set': data})
         if result.matched_count > 0:
             return jsonify({"message": "Pokemon updated successfully"}), 200
         return jsonify({"message": "Pokemon not found"}), 404
+    except DuplicateKeyError:
+        return jsonify({"error": "Pokemon with this name already exists"}), 409
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return server_error(e)
 
 @app.route('/pokemon/<id>', methods=['DELETE'])
 def delete_pokemon(id):
@@ -85,8 +305,134 @@ def delete_pokemon(id):
             return jsonify({"message": "Pokemon deleted successfully"}), 200
         return jsonify({"message": "Pokemon not found"}), 404
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return server_error(e)
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Expose this worker's metrics in Prometheus text format."""
+    return Response(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+@app.route('/metrics/cache', methods=['GET'])
+def cache_metrics():
+    """Report response cache counters for this worker process."""
+    return jsonify(response_cache.stats()), 200
+
+def read_bulk_body():
+    """Return the items of a bulk request: a JSON array or an NDJSON body."""
+    if request.mimetype == NDJSON:
+        return [app.json.loads(line) for line in request.get_data().splitlines() if line.strip()]
+    items = request.get_json(silent=True)
+    return items if isinstance(items, list) else None
+
+def run_bulk(items, to_operation):
+    """Run items as unordered bulk_writes in chunks and return one result per item.
+
+    `to_operation(item)` returns (operation, _id) or raises ValueError with a
+    message for invalid items. Updates and deletes of ids that don't exist
+    are reported as 404 after a single existence query per chunk. Earlier
+    chunks are already committed when a later one fails, so a driver error
+    marks only that chunk's items 500 and the other results are still returned.
+    Failed inserts carry no `_id`: the id generated for them was never stored.
+    """
+    results = [None] * len(items)
+    for start in range(0, len(items), BULK_CHUNK_SIZE):
+        operations, positions, ids = [], [], []
+        for index in range(start, min(start + BULK_CHUNK_SIZE, len(items))):
+            try:
+                operation, doc_id = to_operation(items[index])
+            except (ValueError, TypeError, InvalidId) as e:
+                results[index] = {"index": index, "status": 400, "error": str(e)}
+                continue
+            operations.append(operation)
+            positions.append(index)
+            ids.append(doc_id)
+        if not operations:
+            continue
+
+        existing = None
+        errors = {}
+        inserting = isinstance(operations[0], InsertOne)
+        try:
+            if not inserting:
+                existing = {doc['_id'] for doc in pokemon_collection.find({'_id': {'$in': ids}}, {'_id': 1})}
+            pokemon_collection.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            errors = {error['index']: error for error in e.details.get('writeErrors', [])}
+        except Exception as e:
+            handler_errors.inc(route_label(), type(e).__name__)
+            app.logger.exception(f"{request.method} {request.path} failed for items {positions[0]}-{positions[-1]}")
+            for index, doc_id in zip(positions, ids):
+                results[index] = {"index": index, "status": 500, "error": str(e)}
+                if not inserting:
+                    results[index]["_id"] = str(doc_id)
+            continue
+
+        for offset, (index, doc_id) in enumerate(zip(positions, ids)):
+            if offset in errors:
+                error = errors[offset]
+                status = 409 if error.get('code') == DUPLICATE_KEY else 500
+                results[index] = {"index": index, "status": status, "error": error.get('errmsg')}
+                if not inserting:
+                    results[index]["_id"] = str(doc_id)
+            elif existing is not None and doc_id not in existing:
+                results[index] = {"index": index, "_id": str(doc_id), "status": 404, "error": "Pokemon not found"}
+            else:
+                status = 201 if existing is None else 200
+                results[index] = {"index": index, "_id": str(doc_id), "status": status}
+    return results
+
+def bulk_response(to_operation):
+    """Parse, validate and execute a bulk request, returning per-item results."""
+    try:
+        items = read_bulk_body()
+    except ValueError:
+        return jsonify({"error": "Invalid NDJSON body"}), 400
+    if items is None:
+        return jsonify({"error": "Expected a JSON array or an NDJSON body"}), 400
+    if len(items) > BULK_MAX_ITEMS:
+        return jsonify({"error": f"At most {BULK_MAX_ITEMS} items per request"}), 413
+    try:
+        results = run_bulk(items, to_operation)
+    except Exception as e:
+        return server_error(e)
+    failed = sum(1 for r in results if r["status"] >= 400)
+    return jsonify({"ok": len(results) - failed, "failed": failed, "results": results}), 200
+
+def bulk_insert(item):
+    validate_new(item)
+    item = dict(item, _id=ObjectId())
+    return InsertOne(item), item['_id']
+
+def bulk_update(item):
+    if not isinstance(item, dict) or '_id' not in item:
+        raise ValueError("Each update needs an _id")
+    fields = {k: v for k, v in item.items() if k != '_id'}
+    validate_update(fields)
+    doc_id = ObjectId(item['_id'])
+    return UpdateOne({'_id': doc_id}, {'$set': fields}), doc_id
+
+def bulk_delete(item):
+    if isinstance(item, dict) and '_id' not in item:
+        raise ValueError("Each delete needs an _id")
+    doc_id = ObjectId(item['_id'] if isinstance(item, dict) else item)
+    return DeleteOne({'_id': doc_id}), doc_id
+
+@app.route('/pokemon/_bulk', methods=['POST'])
+def create_pokemon_bulk():
+    """Create many Pokemon entries from a JSON array or NDJSON body."""
+    return bulk_response(bulk_insert)
+
+@app.route('/pokemon/_bulk', methods=['PUT'])
+def update_pokemon_bulk():
+    """Update many Pokemon entries; each item is {"_id": ..., <fields to set>}."""
+    return bulk_response(bulk_update)
+
+@app.route('/pokemon/_bulk', methods=['DELETE'])
+def delete_pokemon_bulk():
+    """Delete many Pokemon entries; each item is an id or {"_id": ...}."""
+    return bulk_response(bulk_delete)
 
 if __name__ == '__main__':
+    # Development server only; production runs under gunicorn (see gunicorn.conf.py)
     # Flask runs on 0.0.0.0 to be accessible from outside the container
     app.run(host='0.0.0.0', port=5000)
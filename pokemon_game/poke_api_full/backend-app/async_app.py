@@ -0,0 +1,188 @@
+# backend-app/async_app.py
+# Async (Quart + motor) variant of the CRUD API in app.py
+#
+# Same routes, JSON shapes and status codes as app.py, but every handler
+# awaits MongoDB instead of blocking a worker thread, so one process can hold
+# thousands of open connections. Run it with hypercorn (see hypercorn.conf.py).
+
+from quart import Quart, Response, request, jsonify
+from pymongo.errors import DuplicateKeyError, PyMongoError
+from bson.objectid import ObjectId
+from queries import DEFAULT_PAGE_SIZE, INDEXES, NDJSON, OBSOLETE_INDEXES, name_query, next_cursor, parse_list_args, validate_new, validate_update
+import json
+import os
+
+app = Quart(__name__)
+
+# MongoDB connection
+# mongomock://... selects an in-memory stand-in (mongomock-motor, see requirements-async-dev.txt) for local testing
+MONGO_URI = os.getenv('MONGO_URI', 'mongodb://localhost:27017/pokeapi_db')
+MONGO_POOL_SIZE = int(os.getenv('MONGO_POOL_SIZE', '200'))  # Shared by every in-flight request of the process
+
+client = None
+pokemon_collection = None # Collection to store Pokemon data, bound at startup
+
+def create_client():
+    """Build the async client; motor binds it to the running event loop."""
+    if MONGO_URI.startswith('mongomock://'):
+        from mongomock_motor import AsyncMongoMockClient
+        return AsyncMongoMockClient()
+    from motor.motor_asyncio import AsyncIOMotorClient
+    return AsyncIOMotorClient(MONGO_URI, maxPoolSize=MONGO_POOL_SIZE)
+
+async def ensure_indexes(collection):
+    """Create the indexes the API relies on; a no-op when they already exist."""
+    try:
+        existing = await collection.index_information()
+        for name in OBSOLETE_INDEXES:
+            if name in existing:
+                await collection.drop_index(name)
+        for keys, options in INDEXES:
+            await collection.create_index(keys, **options)
+    except PyMongoError as e:
+        app.logger.warning(f"Could not create indexes: {e}")
+
+@app.before_serving
+async def connect():
+    global client, pokemon_collection
+    client = create_client()
+    pokemon_collection = client.pokeapi_db.pokemon
+    await ensure_indexes(pokemon_collection)
+
+@app.after_serving
+async def disconnect():
+    client.close()
+
+@app.route('/')
+async def home():
+    return "PokeAPI Backend is running!"
+
+@app.route('/ready')
+async def ready():
+    """Readiness probe: 200 once this process can reach MongoDB, 503 otherwise."""
+    try:
+        await client.admin.command('ping')
+        return jsonify({"status": "ready"}), 200
+    except Exception as e:
+        return jsonify({"status": "unavailable", "error": str(e)}), 503
+
+@app.route('/pokemon_game', methods=['POST'])
+async def create_pokemon():
+    """Create a new Pokemon entry."""
+    data = await request.get_json(silent=True)
+    try:
+        validate_new(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        result = await pokemon_collection.insert_one(data)
+        data['_id'] = str(result.inserted_id) # Convert ObjectId to string for JSON
+        return jsonify(data), 201
+    except DuplicateKeyError:
+        return jsonify({"error": "Pokemon with this name already exists"}), 409
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/pokemon', methods=['GET'])
+async def get_all_pokemon():
+    """Retrieve Pokemon entries in _id order, one page at a time (same args as app.py)."""
+    return await list_pokemon({})
+
+async def list_pokemon(query):
+    """Return the documents matching `query`, paged, projected or streamed per the request args."""
+    try:
+        list_query = parse_list_args(request.args, query, request.accept_mimetypes.best == NDJSON)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        cursor = pokemon_collection.find(list_query.query, list_query.projection).sort('_id', 1)
+        if list_query.limit is not None:
+            cursor = cursor.limit(list_query.limit)
+        if list_query.stream:
+            async def generate():
+                try:
+                    async for pokemon in cursor.batch_size(DEFAULT_PAGE_SIZE):
+                        pokemon['_id'] = str(pokemon['_id'])
+                        yield json.dumps(pokemon) + '\n'
+                except Exception as e:
+                    # The 200 status is already sent; a final error line tells the client the stream is incomplete
+                    app.logger.exception("Streaming /pokemon failed")
+                    yield json.dumps({"error": str(e)}) + '\n'
+            return Response(generate(), mimetype=NDJSON)
+
+        pokemon_list = []
+        async for pokemon in cursor:
+            pokemon['_id'] = str(pokemon['_id']) # Convert ObjectId to string
+            pokemon_list.append(pokemon)
+        response = jsonify(pokemon_list)
+        cursor_id = next_cursor(pokemon_list, list_query.limit)
+        if cursor_id is not None:
+            response.headers['X-Next-Cursor'] = cursor_id
+        return response, 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/pokemon/name/<name>', methods=['GET'])
+async def get_pokemon_by_name(name):
+    """Retrieve a Pokemon entry by name; ?owner= picks the one of that owner."""
+    try:
+        pokemon = await pokemon_collection.find_one(name_query(name, request.args))
+        if pokemon:
+            pokemon['_id'] = str(pokemon['_id'])
+            return jsonify(pokemon), 200
+        return jsonify({"message": "Pokemon not found"}), 404
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/pokemon/type/<type_name>', methods=['GET'])
+async def get_pokemon_by_type(type_name):
+    """Retrieve Pokemon entries of one type; accepts the same paging args as GET /pokemon."""
+    return await list_pokemon({'type': type_name})
+
+@app.route('/pokemon/<id>', methods=['GET'])
+async def get_pokemon_by_id(id):
+    """Retrieve a single Pokemon entry by ID."""
+    try:
+        pokemon = await pokemon_collection.find_one({'_id': ObjectId(id)})
+        if pokemon:
+            pokemon['_id'] = str(pokemon['_id'])
+            return jsonify(pokemon), 200
+        return jsonify({"message": "Pokemon not found"}), 404
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/pokemon/<id>', methods=['PUT'])
+async def update_pokemon(id):
+    """Update an existing Pokemon entry by ID."""
+    data = await request.get_json(silent=True)
+    try:
+        validate_update(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        result = await pokemon_collection.update_one({'_id': ObjectId(id)}, {'$set': data})
+        if result.matched_count > 0:
+            return jsonify({"message": "Pokemon updated successfully"}), 200
+        return jsonify({"message": "Pokemon not found"}), 404
+    except DuplicateKeyError:
+        return jsonify({"error": "Pokemon with this name already exists"}), 409
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/pokemon/<id>', methods=['DELETE'])
+async def delete_pokemon(id):
+    """Delete a Pokemon entry by ID."""
+    try:
+        result = await pokemon_collection.delete_one({'_id': ObjectId(id)})
+        if result.deleted_count > 0:
+            return jsonify({"message": "Pokemon deleted successfully"}), 200
+        return jsonify({"message": "Pokemon not found"}), 404
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+if __name__ == '__main__':
+    # Development server only; production runs under hypercorn (see hypercorn.conf.py)
+    app.run(host='0.0.0.0', port=5000)
@@ -0,0 +1,57 @@
+# backend-app/gunicorn.conf.py
+# Production serving: gunicorn --config gunicorn.conf.py app:app
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+
+# Worker processes x threads; each worker owns one MongoClient (see app.get_client)
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+
+# Each worker keeps its own metrics; with several, they share them through
+# this directory so /metrics reports the whole server, whichever worker answers.
+# Read by app.py when it is imported, so it is set before preloading.
+_own_metrics_dir = workers > 1 and not os.getenv('PROMETHEUS_MULTIPROC_DIR')
+if _own_metrics_dir:
+    os.environ['PROMETHEUS_MULTIPROC_DIR'] = tempfile.mkdtemp(prefix='gunicorn-metrics-')
+METRICS_SAVE_INTERVAL = float(os.getenv('METRICS_SAVE_INTERVAL', '1.0'))  # Seconds other workers' values may lag
+
+# Importing app in the master is safe: no MongoClient exists until a worker serves a request
+preload_app = True
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '30'))
+graceful_timeout = int(os.getenv('GRACEFUL_TIMEOUT', '30'))  # In-flight requests get this long after SIGTERM
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '5'))
+
+accesslog = '-'
+errorlog = '-'
+
+def on_starting(server):
+    """Start every run's metrics from zero."""
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        from metrics import clear_shared_dir
+        clear_shared_dir(os.environ['PROMETHEUS_MULTIPROC_DIR'])
+
+def post_fork(server, worker):
+    """Make sure a worker never reuses a MongoClient created before the fork; start sharing its metrics."""
+    from app import close_client, metrics
+    close_client()
+    if metrics.shared_dir:
+        metrics.start_saving(METRICS_SAVE_INTERVAL)
+
+def worker_exit(server, worker):
+    """Close the worker's MongoDB connections on graceful shutdown and save its final metrics."""
+    from app import close_client, metrics
+    close_client()
+    if metrics.shared_dir:
+        metrics.stop_saving()
+
+def on_exit(server):
+    """Remove the metrics directory created above."""
+    if _own_metrics_dir:
+        shutil.rmtree(os.environ['PROMETHEUS_MULTIPROC_DIR'], ignore_errors=True)
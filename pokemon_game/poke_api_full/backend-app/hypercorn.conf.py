@@ -0,0 +1,19 @@
+# backend-app/hypercorn.conf.py
+# Async serving: hypercorn --config file:hypercorn.conf.py async_app:app
+
+import multiprocessing
+import os
+
+bind = [f"0.0.0.0:{os.getenv('PORT', '5000')}"]
+
+# One event loop per worker; each holds its own motor pool (see async_app.connect)
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+worker_class = 'asyncio'
+
+# Room for thousands of concurrent connections per process
+backlog = int(os.getenv('HYPERCORN_BACKLOG', '2048'))
+keep_alive_timeout = int(os.getenv('HYPERCORN_KEEPALIVE', '5'))
+graceful_timeout = int(os.getenv('GRACEFUL_TIMEOUT', '30'))
+
+accesslog = '-'
+errorlog = '-'
@@ -0,0 +1,327 @@
+# backend-app/loadtest.py
+# Load-test the CRUD API with mixed workloads
+#
+#   python loadtest.py --workload read-heavy --concurrency 32 --duration 20
+#   python loadtest.py --url http://localhost:5000 --workload bulk --output bulk.json
+#
+# Without --url the app is driven in process through Flask's test client
+# against an in-memory MongoDB (MONGO_URI=mongomock://), so it runs fully
+# offline; set MONGO_URI to a local mongod to include the driver and the
+# database. With --url any running instance is tested over HTTP, including
+# async_app under hypercorn; it has no bulk routes, so seeding falls back to
+# single inserts and the bulk operations are skipped. Reads go through the
+# response cache unless the server runs with RESPONSE_CACHE_SIZE=0.
+
+import argparse
+import json
+import os
+import random
+import statistics
+import threading
+import time
+from collections import defaultdict
+
+# Paths the scenarios hit, with the query string dropped and ids collapsed
+ROUTE_PAGE = 'GET /pokemon'
+ROUTE_GET_ID = 'GET /pokemon/<id>'
+ROUTE_GET_NAME = 'GET /pokemon/name/<name>'
+ROUTE_GET_TYPE = 'GET /pokemon/type/<type>'
+ROUTE_CREATE = 'POST /pokemon_game'
+ROUTE_UPDATE = 'PUT /pokemon/<id>'
+ROUTE_DELETE = 'DELETE /pokemon/<id>'
+ROUTE_BULK_CREATE = 'POST /pokemon/_bulk'
+ROUTE_BULK_UPDATE = 'PUT /pokemon/_bulk'
+BULK_ROUTES = (ROUTE_BULK_CREATE, ROUTE_BULK_UPDATE)
+NO_ROUTE = (404, 405)  # Status of a route the server doesn't have
+
+TYPES = ['normal', 'fire', 'water', 'grass', 'electric', 'ice', 'fighting', 'poison', 'ground',
+         'flying', 'psychic', 'bug', 'rock', 'ghost', 'dragon', 'dark', 'steel', 'fairy']
+
+# Relative weight of each operation per workload
+WORKLOADS = {
+    'read-heavy': {ROUTE_PAGE: 30, ROUTE_GET_ID: 30, ROUTE_GET_NAME: 20, ROUTE_GET_TYPE: 10,
+                   ROUTE_CREATE: 5, ROUTE_UPDATE: 4, ROUTE_DELETE: 1},
+    'write-heavy': {ROUTE_PAGE: 5, ROUTE_GET_ID: 10, ROUTE_GET_NAME: 5,
+                    ROUTE_CREATE: 45, ROUTE_UPDATE: 30, ROUTE_DELETE: 5},
+    'bulk': {ROUTE_BULK_CREATE: 40, ROUTE_BULK_UPDATE: 30, ROUTE_PAGE: 30},
+}
+
+class HttpTarget:
+    """Sends requests to a running server over one pooled connection per thread."""
+
+    def __init__(self, base_url, concurrency):
+        import requests
+        from requests.adapters import HTTPAdapter
+        self.base_url = base_url.rstrip('/')
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def request(self, method, path, body=None):
+        response = self.session.request(method, self.base_url + path, json=body, timeout=30)
+        return response.status_code, response.content
+
+class InProcessTarget:
+    """Calls app.py through Flask's test client; one client per thread."""
+
+    def __init__(self):
+        os.environ.setdefault('MONGO_URI', 'mongomock://localhost/pokeapi_db')
+        from app import app
+        self.app = app
+        self.local = threading.local()
+
+    def request(self, method, path, body=None):
+        client = getattr(self.local, 'client', None)
+        if client is None:
+            client = self.local.client = self.app.test_client()
+        response = client.open(path, method=method, json=body)
+        return response.status_code, response.get_data()
+
+class Pool:
+    """Ids and names the workers can read, update and delete, shared by all threads."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.ids = []
+        self.names = []
+        self.counter = 0
+
+    def add(self, doc_id, name):
+        with self.lock:
+            self.ids.append(doc_id)
+            self.names.append(name)
+
+    def new_name(self):
+        with self.lock:
+            self.counter += 1
+            return f"loadmon-{os.getpid()}-{self.counter}-{random.getrandbits(32):08x}"
+
+    def pick(self, rng):
+        with self.lock:
+            index = rng.randrange(len(self.ids))
+            return self.ids[index], self.names[index]
+
+    def take(self, rng):
+        """Remove and return a random (id, name), or None when too few remain."""
+        with self.lock:
+            if len(self.ids) < 2:
+                return None
+            index = rng.randrange(len(self.ids))
+            self.ids[index], self.ids[-1] = self.ids[-1], self.ids[index]
+            self.names[index], self.names[-1] = self.names[-1], self.names[index]
+            return self.ids.pop(), self.names.pop()
+
+def new_pokemon(pool, rng):
+    pokemon_type = rng.choice(TYPES)
+    return {"name": pool.new_name(), "type": pokemon_type, "types": [pokemon_type], "height": rng.randint(1, 200)}
+
+def seed(target, pool, count, batch_size):
+    """Insert `count` Pokemon and remember their ids; returns whether the server has bulk routes.
+
+    Uses the bulk endpoint, or one POST /pokemon_game per Pokemon on servers
+    without it (async_app).
+    """
+    rng = random.Random(0)
+    bulk = True
+    for start in range(0, count, batch_size):
+        items = [new_pokemon(pool, rng) for _ in range(min(batch_size, count - start))]
+        if bulk:
+            status, body = target.request('POST', '/pokemon/_bulk', items)
+            bulk = status not in NO_ROUTE
+        if bulk:
+            if status != 200:
+                raise SystemExit(f"Seeding failed with HTTP {status}: {body[:200]!r}")
+            for result in json.loads(body)['results']:
+                if result['status'] == 201:
+                    pool.add(result['_id'], items[result['index']]['name'])
+            continue
+        for item in items:
+            status, body = target.request('POST', '/pokemon_game', item)
+            if status not in (201, 409):
+                raise SystemExit(f"Seeding failed with HTTP {status}: {body[:200]!r}")
+            if status == 201:
+                pool.add(json.loads(body)['_id'], item['name'])
+    return bulk
+
+def run_operation(route, target, pool, rng, page_size, batch_size):
+    """Issue one request for `route` and return (status, response size)."""
+    if route == ROUTE_PAGE:
+        return target.request('GET', f'/pokemon?limit={page_size}')
+    if route == ROUTE_GET_ID:
+        return target.request('GET', f'/pokemon/{pool.pick(rng)[0]}')
+    if route == ROUTE_GET_NAME:
+        return target.request('GET', f'/pokemon/name/{pool.pick(rng)[1]}')
+    if route == ROUTE_GET_TYPE:
+        return target.request('GET', f'/pokemon/type/{rng.choice(TYPES)}?limit={page_size}')
+    if route == ROUTE_CREATE:
+        item = new_pokemon(pool, rng)
+        status, body = target.request('POST', '/pokemon_game', item)
+        if status == 201:
+            pool.add(json.loads(body)['_id'], item['name'])
+        return status, body
+    if route == ROUTE_UPDATE:
+        return target.request('PUT', f'/pokemon/{pool.pick(rng)[0]}', {"height": rng.randint(1, 200)})
+    if route == ROUTE_DELETE:
+        taken = pool.take(rng)
+        if taken is None:
+            return target.request('GET', f'/pokemon/{pool.pick(rng)[0]}')
+        return target.request('DELETE', f'/pokemon/{taken[0]}')
+    if route == ROUTE_BULK_CREATE:
+        items = [new_pokemon(pool, rng) for _ in range(batch_size)]
+        status, body = target.request('POST', '/pokemon/_bulk', items)
+        if status == 200:
+            for result in json.loads(body)['results']:
+                if result['status'] == 201:
+                    pool.add(result['_id'], items[result['index']]['name'])
+        return status, body
+    if route == ROUTE_BULK_UPDATE:
+        items = [{"_id": pool.pick(rng)[0], "height": rng.randint(1, 200)} for _ in range(batch_size)]
+        return target.request('PUT', '/pokemon/_bulk', items)
+    raise ValueError(f"Unknown route {route}")
+
+def percentile(ordered, p):
+    if not ordered:
+        return None
+    return ordered[max(0, min(len(ordered) - 1, round(p / 100 * len(ordered)) - 1))]
+
+def summarize(samples, elapsed):
+    """Throughput, latency percentiles (ms) and error counts for a list of samples."""
+    latencies = sorted(latency for latency, _, _ in samples)
+    statuses = defaultdict(int)
+    for _, status, _ in samples:
+        statuses[status] += 1
+    errors = sum(count for status, count in statuses.items() if status is None or status >= 500)
+    client_errors = sum(count for status, count in statuses.items() if status is not None and 400 <= status < 500)
+    return {
+        "requests": len(samples),
+        "rps": round(len(samples) / elapsed, 1) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 3) if latencies else None,
+            "p95": round(percentile(latencies, 95) * 1000, 3) if latencies else None,
+            "p99": round(percentile(latencies, 99) * 1000, 3) if latencies else None,
+            "max": round(latencies[-1] * 1000, 3) if latencies else None,
+            "mean": round(statistics.fmean(latencies) * 1000, 3) if latencies else None
+        },
+        "error_rate": errors / len(samples) if samples else 0.0,
+        "client_error_rate": client_errors / len(samples) if samples else 0.0,
+        "bytes_per_response": round(statistics.fmean(size for _, _, size in samples)) if samples else 0,
+        "statuses": {str(status): count for status, count in sorted(statuses.items(), key=lambda s: str(s[0]))}
+    }
+
+def load_test(target, workload, concurrency, duration=None, requests_total=None,
+              page_size=50, batch_size=100, seed_count=1000, warmup=1.0):
+    """Drive `target` with `concurrency` threads and return the report dict.
+
+    Runs for `duration` seconds or until `requests_total` requests have been
+    sent, whichever is given. Requests sent during the first `warmup`
+    seconds are excluded from the report. A status of None in the results
+    means the request raised (connection refused, timeout, ...). Bulk
+    operations are skipped, and listed in meta.skipped, on servers without
+    bulk routes.
+    """
+    pool = Pool()
+    bulk = seed(target, pool, seed_count, batch_size)
+    weights = WORKLOADS[workload]
+    skipped = [] if bulk else [route for route in weights if route in BULK_ROUTES]
+    weights = {route: weight for route, weight in weights.items() if route not in skipped}
+    routes, route_weights = list(weights), list(weights.values())
+
+    samples = defaultdict(list)
+    samples_lock = threading.Lock()
+    remaining = [requests_total]
+    started = time.perf_counter()
+    measure_from = started + warmup
+    deadline = started + warmup + duration if duration else None
+
+    def next_ticket():
+        if deadline is not None:
+            return time.perf_counter() < deadline
+        with samples_lock:
+            if remaining[0] <= 0:
+                return False
+            remaining[0] -= 1
+            return True
+
+    def worker(index):
+        rng = random.Random(index)
+        local = defaultdict(list)
+        while next_ticket():
+            route = rng.choices(routes, route_weights)[0]
+            request_started = time.perf_counter()
+            try:
+                status, body = run_operation(route, target, pool, rng, page_size, batch_size)
+                size = len(body)
+            except Exception:
+                status, size = None, 0
+            finished = time.perf_counter()
+            if deadline is None or request_started >= measure_from:
+                local[route].append((finished - request_started, status, size))
+        with samples_lock:
+            for route, route_samples in local.items():
+                samples[route].extend(route_samples)
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - (measure_from if deadline is not None else started)
+
+    every = [sample for route_samples in samples.values() for sample in route_samples]
+    return {
+        "meta": {
+            "workload": workload,
+            "concurrency": concurrency,
+            "duration_s": round(elapsed, 3),
+            "page_size": page_size,
+            "batch_size": batch_size,
+            "seeded": seed_count,
+            "skipped": skipped,
+            "started_at": int(time.time() - elapsed)
+        },
+        "total": summarize(every, elapsed),
+        "routes": {route: summarize(samples[route], elapsed) for route in routes if samples[route]}
+    }
+
+def format_report(report):
+    """Render a report as a fixed-width table, one row per route plus a total."""
+    meta = report["meta"]
+    lines = [f"{meta['workload']}: {meta['concurrency']} threads for {meta['duration_s']} s"]
+    if meta.get("skipped"):
+        lines.append(f"skipped (no such route on the server): {', '.join(meta['skipped'])}")
+    lines.append(f"{'route':<28}{'requests':>9}{'rps':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}{'4xx':>8}")
+    rows = list(report["routes"].items()) + [("total", report["total"])]
+    for route, stats in rows:
+        latency = stats["latency_ms"]
+        lines.append(f"{route:<28}{stats['requests']:>9}{stats['rps']:>9}{latency['p50']:>9}{latency['p95']:>9}"
+                     f"{latency['p99']:>9}{stats['error_rate']:>8.2%}{stats['client_error_rate']:>8.2%}")
+    return '\n'.join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the Pokemon CRUD API with a mixed workload.")
+    parser.add_argument('--url', help="base URL of a running server; default: drive app.py in process")
+    parser.add_argument('--workload', choices=sorted(WORKLOADS), default='read-heavy')
+    parser.add_argument('--concurrency', type=int, default=16, help="client threads")
+    parser.add_argument('--duration', type=float, default=10.0, help="seconds to run after warm-up")
+    parser.add_argument('--requests', type=int, help="send this many requests instead of running for --duration")
+    parser.add_argument('--warmup', type=float, default=1.0, help="seconds excluded from the report")
+    parser.add_argument('--page-size', type=int, default=50, help="limit for list requests")
+    parser.add_argument('--batch-size', type=int, default=100, help="items per bulk request")
+    parser.add_argument('--seed', type=int, default=1000, help="Pokemon inserted before the run")
+    parser.add_argument('--output', help="also write the JSON report here")
+    args = parser.parse_args()
+
+    target = HttpTarget(args.url, args.concurrency) if args.url else InProcessTarget()
+    report = load_test(target, args.workload, args.concurrency,
+                       duration=None if args.requests else args.duration, requests_total=args.requests,
+                       page_size=args.page_size, batch_size=args.batch_size, seed_count=args.seed,
+                       warmup=0.0 if args.requests else args.warmup)
+    report["meta"]["target"] = args.url or f"in-process ({os.environ['MONGO_URI']})"
+    print(format_report(report))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,246 @@
+# backend-app/metrics.py
+# Counters, gauges and histograms rendered in Prometheus text format
+#
+# Each process keeps its own values. With a shared directory (set
+# PROMETHEUS_MULTIPROC_DIR; gunicorn.conf.py does when it runs several
+# workers) every worker also saves them there, and a scrape of any worker
+# reports the sum over all of them, as prometheus_client's multiprocess mode
+# does.
+
+import bisect
+import glob
+import json
+import os
+import threading
+from pymongo import monitoring
+
+# Seconds; covers cached reads (sub-millisecond) through slow bulk writes
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Bytes
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _labels(names, values, extra=''):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Metric:
+    """Base class: one time series per combination of label values."""
+
+    kind = 'untyped'
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def header(self):
+        return [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.kind}']
+
+    def dump(self):
+        """This metric's definition and values as JSON-compatible data."""
+        with self._lock:
+            series = [[list(labels), value] for labels, value in self._series.items()]
+        return {'name': self.name, 'help': self.help, 'kind': self.kind, 'labels': list(self.label_names),
+                'series': series}
+
+    @classmethod
+    def load(cls, data):
+        """An empty metric defined like dump() output; merge() adds the values."""
+        return cls(data['name'], data['help'], data['labels'])
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._series[labels] = self._series.get(labels, 0) + amount
+
+    def merge(self, series):
+        for labels, value in series:
+            self.inc(*labels, amount=value)
+
+    def render(self):
+        with self._lock:
+            series = list(self._series.items())
+        return self.header() + [f'{self.name}{_labels(self.label_names, labels)} {_number(value)}'
+                                for labels, value in series]
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+
+    def dump(self):
+        with self._lock:
+            series = [[list(labels), [list(counts), total]] for labels, (counts, total) in self._series.items()]
+        return {'name': self.name, 'help': self.help, 'kind': self.kind, 'labels': list(self.label_names),
+                'buckets': list(self.buckets), 'series': series}
+
+    @classmethod
+    def load(cls, data):
+        return cls(data['name'], data['help'], data['labels'], data['buckets'])
+
+    def merge(self, series):
+        with self._lock:
+            for labels, (counts, total) in series:
+                merged = self._series.setdefault(tuple(labels), [[0] * (len(self.buckets) + 1), 0.0])
+                merged[0] = [a + b for a, b in zip(merged[0], counts)]
+                merged[1] += total
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self):
+        with self._lock:
+            series = [(labels, list(counts), total) for labels, (counts, total) in self._series.items()]
+        lines = self.header()
+        for labels, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else _number(bound)
+                bucket_labels = _labels(self.label_names, labels, 'le="' + le + '"')
+                lines.append(f'{self.name}_bucket{bucket_labels} {cumulative}')
+            lines.append(f'{self.name}_sum{_labels(self.label_names, labels)} {_number(total)}')
+            lines.append(f'{self.name}_count{_labels(self.label_names, labels)} {cumulative}')
+        return lines
+
+class Registry:
+    """Holds the metrics of one process and renders them for /metrics.
+
+    Collectors are callables returning extra Metric objects at scrape time,
+    for values that already live elsewhere (e.g. the response cache stats).
+    With `shared_dir`, render() reports the sum over every process that
+    saved its values there (see save()).
+    """
+
+    def __init__(self, shared_dir=None):
+        self.metrics = []
+        self.collectors = []
+        self.shared_dir = shared_dir
+        self._saver = None
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, labels=()):
+        return self.register(Counter(name, help, labels))
+
+    def gauge(self, name, help, labels=()):
+        return self.register(Gauge(name, help, labels))
+
+    def histogram(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, help, labels, buckets))
+
+    def collect(self):
+        metrics = list(self.metrics)
+        for collect in self.collectors:
+            metrics.extend(collect())
+        return metrics
+
+    def save(self, live=True):
+        """Write this process's values to shared_dir, for scrapes served by other processes.
+
+        An exiting process saves with live=False: its counters and histograms
+        keep counting in the sum, its gauges no longer do.
+        """
+        data = [metric.dump() for metric in self.collect() if live or metric.kind != 'gauge']
+        path = os.path.join(self.shared_dir, f'{os.getpid()}.json')
+        with open(f'{path}.tmp', 'w') as f:
+            json.dump(data, f)
+        os.replace(f'{path}.tmp', path)
+
+    def start_saving(self, interval=1.0):
+        """Save every `interval` seconds from a daemon thread (call once per worker, after the fork)."""
+        def run():
+            while not stop.wait(interval):
+                self.save()
+        stop = threading.Event()
+        self._saver = stop
+        threading.Thread(target=run, name='metrics-saver', daemon=True).start()
+
+    def stop_saving(self):
+        """Stop the saving thread and save one last time as an exiting process."""
+        if self._saver is not None:
+            self._saver.set()
+            self._saver = None
+        self.save(live=False)
+
+    def _shared_metrics(self):
+        self.save()  # This process's values are always current
+        merged = {}
+        for path in sorted(glob.glob(os.path.join(self.shared_dir, '*.json'))):
+            try:
+                with open(path) as f:
+                    dumped = json.load(f)
+            except (OSError, ValueError):
+                continue  # Removed or replaced while we read it
+            for data in dumped:
+                metric = merged.get(data['name'])
+                if metric is None:
+                    metric = merged[data['name']] = METRIC_KINDS[data['kind']].load(data)
+                metric.merge(data['series'])
+        return list(merged.values())
+
+    def render(self):
+        metrics = self._shared_metrics() if self.shared_dir else self.collect()
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+METRIC_KINDS = {cls.kind: cls for cls in (Counter, Gauge, Histogram)}
+
+def clear_shared_dir(shared_dir):
+    """Remove the values saved by earlier runs (call once, before the workers start)."""
+    for path in glob.glob(os.path.join(shared_dir, '*.json*')):
+        os.remove(path)
+
+class CommandTimer(monitoring.CommandListener):
+    """pymongo listener that records the duration of every MongoDB command."""
+
+    def __init__(self, duration, failures):
+        self.duration = duration
+        self.failures = failures
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self.duration.observe(event.duration_micros / 1e6, event.command_name)
+
+    def failed(self, event):
+        self.duration.observe(event.duration_micros / 1e6, event.command_name)
+        failure = event.failure if isinstance(event.failure, dict) else {}
+        self.failures.inc(event.command_name, failure.get('codeName') or 'error')
+
+def sample(metric_class, name, help, value):
+    """A label-less Counter or Gauge holding one value, for collectors."""
+    metric = metric_class(name, help)
+    metric.inc(amount=value)
+    return metric
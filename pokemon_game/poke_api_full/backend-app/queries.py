@@ -0,0 +1,92 @@
+# backend-app/queries.py
+# Request parsing, validation and index definitions shared by app.py and async_app.py
+#
+# Nothing here talks to a driver or depends on the web framework, so the
+# Flask/pymongo and Quart/motor apps accept the same arguments, build the
+# same queries and reject the same input with the same messages.
+
+from collections import namedtuple
+from pymongo import ASCENDING
+from bson.objectid import ObjectId
+from bson.errors import InvalidId
+import os
+
+# Paging for GET /pokemon
+DEFAULT_PAGE_SIZE = int(os.getenv('DEFAULT_PAGE_SIZE', '100'))
+MAX_PAGE_SIZE = int(os.getenv('MAX_PAGE_SIZE', '1000'))
+
+NDJSON = 'application/x-ndjson'
+
+# (keys, options) for each index the API relies on; passed to create_index as is
+INDEXES = [
+    # Names are unique per owner (the game user that pushed them); documents
+    # without an owner share the null owner, so their names stay unique as before.
+    ([('owner', ASCENDING), ('name', ASCENDING)], {'unique': True, 'name': 'owner_name_unique'}),
+    # (type, _id) and (owner, _id) serve lookups and keyset paging within a type or an owner.
+    ([('type', ASCENDING), ('_id', ASCENDING)], {'name': 'type_id'}),
+    ([('owner', ASCENDING), ('_id', ASCENDING)], {'name': 'owner_id'})
+]
+
+# Indexes of earlier versions that would contradict INDEXES; dropped at startup
+OBSOLETE_INDEXES = ['name_unique']
+
+# How to run a list request: find(query, projection) in _id order, cut at
+# limit (None: no limit), either as one JSON array or streamed as NDJSON.
+ListQuery = namedtuple('ListQuery', ['query', 'projection', 'limit', 'stream'])
+
+def parse_list_args(args, query, ndjson_accepted=False):
+    """Turn the args of a list request into a ListQuery; ValueError on bad input.
+
+    Query parameters:
+      limit  - page size (default DEFAULT_PAGE_SIZE, capped at MAX_PAGE_SIZE)
+      after  - cursor: the X-Next-Cursor header of the previous page
+      fields - comma-separated fields to return (_id is always included)
+      owner  - only documents with this owner
+      format - 'ndjson' (or Accept: application/x-ndjson) streams one document
+               per line; without an explicit limit it streams every match
+
+    Without limit or after the whole result is returned as one array, as it
+    was before paging, so existing clients keep getting everything.
+    """
+    try:
+        limit = int(args.get('limit', DEFAULT_PAGE_SIZE))
+        if 'after' in args:
+            query = dict(query, _id={'$gt': ObjectId(args['after'])})
+    except (ValueError, InvalidId):
+        raise ValueError("limit must be an integer and after a valid id")
+    if limit < 1:
+        raise ValueError("limit must be positive")
+    limit = min(limit, MAX_PAGE_SIZE)
+    if 'owner' in args:
+        query = dict(query, owner=args['owner'])
+    fields = [f for f in args.get('fields', '').split(',') if f]
+    projection = {f: 1 for f in fields} if fields else None
+
+    stream = args.get('format') == 'ndjson' or ndjson_accepted
+    if stream:
+        paged = 'limit' in args
+    else:
+        paged = 'limit' in args or 'after' in args
+    return ListQuery(query, projection, limit if paged else None, stream)
+
+def name_query(name, args):
+    """The filter for a lookup by name, scoped to args['owner'] when given."""
+    if 'owner' in args:
+        return {'name': name, 'owner': args['owner']}
+    return {'name': name}
+
+def next_cursor(page, limit):
+    """The X-Next-Cursor value for a full page, or None after the last one."""
+    if limit is not None and len(page) == limit:
+        return str(page[-1]['_id'])
+    return None
+
+def validate_new(data):
+    """Raise ValueError unless `data` can be inserted as a Pokemon."""
+    if not isinstance(data, dict) or 'name' not in data or 'type' not in data:
+        raise ValueError("Name and type are required")
+
+def validate_update(data):
+    """Raise ValueError unless `data` holds fields to set."""
+    if not data:
+        raise ValueError("No data provided for update")
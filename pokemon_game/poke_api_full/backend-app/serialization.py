@@ -0,0 +1,57 @@
+# backend-app/serialization.py
+# JSON provider that encodes Mongo documents as they come from the driver
+
+import json
+from bson.objectid import ObjectId
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson # C-backed encoder; optional
+except ImportError:
+    orjson = None
+
+def encode_default(obj):
+    """Encode the BSON types the API returns; ObjectIds become their hex string."""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    return DefaultJSONProvider.default(obj)
+
+class MongoJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that serializes ObjectId without copying documents.
+
+    Handlers pass driver documents straight to jsonify() instead of rewriting
+    each `_id` first. With orjson installed, encoding happens in C and the
+    bytes go into the response without a str round trip; otherwise the
+    stdlib encoder is used with the same output.
+    """
+
+    default = staticmethod(encode_default)
+
+    def dumps(self, obj, **kwargs):
+        return self.dumps_bytes(obj, **kwargs).decode()
+
+    def dumps_bytes(self, obj, **kwargs):
+        """Serialize obj to compact UTF-8 JSON bytes."""
+        sort_keys = kwargs.get('sort_keys', self.sort_keys)
+        if orjson is not None and not kwargs.get('indent'):
+            option = orjson.OPT_SORT_KEYS if sort_keys else 0
+            try:
+                return orjson.dumps(obj, default=self.default, option=option)
+            except TypeError:
+                pass # e.g. integers beyond 64 bits; the stdlib encoder handles them
+        kwargs.setdefault('default', self.default)
+        kwargs.setdefault('sort_keys', sort_keys)
+        kwargs.setdefault('ensure_ascii', False)
+        kwargs.setdefault('separators', (',', ':'))
+        return json.dumps(obj, **kwargs).encode()
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(obj) # Indented output for debugging
+        return self._app.response_class(self.dumps_bytes(obj) + b'\n', mimetype=self.mimetype)
@@ -0,0 +1,133 @@
+# backend-app/test_async_app.py
+# Tests for async_app.py against an in-memory MongoDB (mongomock-motor)
+#
+#   pip install -r requirements-async-dev.txt && python -m pytest test_async_app.py
+
+import asyncio
+import json
+import os
+
+os.environ['MONGO_URI'] = 'mongomock://' # Read when async_app is imported
+
+import async_app
+from bson.objectid import ObjectId
+
+def run(scenario):
+    """Run `scenario(client)` inside a served app, on an emptied collection."""
+    async def serve():
+        async with async_app.app.test_app() as test_app:
+            await async_app.pokemon_collection.delete_many({})
+            await scenario(test_app.test_client())
+    asyncio.run(serve())
+
+async def seed(client, count):
+    ids = []
+    for i in range(count):
+        response = await client.post('/pokemon_game', json={'name': f'mon-{i}', 'type': 'fire' if i % 2 else 'water'})
+        ids.append((await response.get_json())['_id'])
+    return ids
+
+def test_create_and_get():
+    async def scenario(client):
+        response = await client.post('/pokemon_game', json={'name': 'pikachu', 'type': 'electric'})
+        assert response.status_code == 201
+        pokemon_id = (await response.get_json())['_id']
+
+        response = await client.get(f'/pokemon/{pokemon_id}')
+        assert response.status_code == 200
+        assert (await response.get_json())['name'] == 'pikachu'
+        response = await client.get('/pokemon/name/pikachu')
+        assert (await response.get_json())['_id'] == pokemon_id
+        response = await client.get(f'/pokemon/{ObjectId()}')
+        assert response.status_code == 404
+    run(scenario)
+
+def test_create_validation_and_duplicates():
+    async def scenario(client):
+        response = await client.post('/pokemon_game', json={'name': 'pikachu'})
+        assert response.status_code == 400
+        assert (await response.get_json())['error'] == "Name and type are required"
+
+        await client.post('/pokemon_game', json={'name': 'pikachu', 'type': 'electric'})
+        response = await client.post('/pokemon_game', json={'name': 'pikachu', 'type': 'electric'})
+        assert response.status_code == 409 # owner_name_unique index from ensure_indexes
+    run(scenario)
+
+def test_unpaged_list_returns_everything():
+    async def scenario(client):
+        await seed(client, 5)
+        response = await client.get('/pokemon')
+        assert len(await response.get_json()) == 5
+        assert 'X-Next-Cursor' not in response.headers
+    run(scenario)
+
+def test_keyset_paging():
+    async def scenario(client):
+        ids = await seed(client, 5)
+        seen = []
+        response = await client.get('/pokemon?limit=2')
+        while True:
+            page = await response.get_json()
+            seen.extend(p['_id'] for p in page)
+            cursor = response.headers.get('X-Next-Cursor')
+            if cursor is None:
+                break
+            response = await client.get(f'/pokemon?limit=2&after={cursor}')
+        assert seen == ids
+
+        response = await client.get('/pokemon/type/fire?limit=10&fields=name')
+        page = await response.get_json()
+        assert [p['name'] for p in page] == ['mon-1', 'mon-3']
+        assert all(set(p) == {'_id', 'name'} for p in page)
+    run(scenario)
+
+def test_bad_paging_args():
+    async def scenario(client):
+        for query in ('limit=abc', 'after=not-an-id', 'limit=0'):
+            response = await client.get(f'/pokemon?{query}')
+            assert response.status_code == 400
+    run(scenario)
+
+def test_ndjson_stream():
+    async def scenario(client):
+        await seed(client, 3)
+        response = await client.get('/pokemon?format=ndjson')
+        assert response.mimetype == 'application/x-ndjson'
+        lines = [json.loads(line) for line in (await response.get_data(as_text=True)).splitlines()]
+        assert [p['name'] for p in lines] == ['mon-0', 'mon-1', 'mon-2']
+
+        response = await client.get('/pokemon', headers={'Accept': 'application/x-ndjson'}, query_string={'limit': '1'})
+        assert len((await response.get_data(as_text=True)).splitlines()) == 1
+    run(scenario)
+
+def test_update_and_delete():
+    async def scenario(client):
+        pokemon_id = (await seed(client, 1))[0]
+        response = await client.put(f'/pokemon/{pokemon_id}', json={})
+        assert response.status_code == 400
+        response = await client.put(f'/pokemon/{pokemon_id}', json={'type': 'ice'})
+        assert response.status_code == 200
+        response = await client.get(f'/pokemon/{pokemon_id}')
+        assert (await response.get_json())['type'] == 'ice'
+
+        response = await client.delete(f'/pokemon/{pokemon_id}')
+        assert response.status_code == 200
+        response = await client.delete(f'/pokemon/{pokemon_id}')
+        assert response.status_code == 404
+    run(scenario)
+
+def test_names_are_unique_per_owner():
+    async def scenario(client):
+        for owner in ('ash', 'misty'):
+            response = await client.post('/pokemon_game', json={'owner': owner, 'name': 'psyduck', 'type': 'water'})
+            assert response.status_code == 201
+        response = await client.post('/pokemon_game', json={'owner': 'ash', 'name': 'psyduck', 'type': 'water'})
+        assert response.status_code == 409
+
+        response = await client.get('/pokemon?owner=misty')
+        assert [p['owner'] for p in await response.get_json()] == ['misty']
+        response = await client.get('/pokemon/name/psyduck?owner=ash')
+        assert (await response.get_json())['owner'] == 'ash'
+        response = await client.get('/pokemon/name/psyduck?owner=brock')
+        assert response.status_code == 404
+    run(scenario)
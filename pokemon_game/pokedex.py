@@ -0,0 +1,59 @@
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+try:
+    from .config import SNAPSHOT_FILE, logger
+except ImportError:
+    from config import SNAPSHOT_FILE, logger
+
+SNAPSHOT_VERSION = 1
+SNAPSHOT_FIELDS = ["name", "id", "types", "height"]
+
+class Pokedex:
+    """Local Pokédex loaded from a snapshot, indexed by name and by id."""
+
+    def __init__(self, rows: List[List], metadata: Optional[Dict] = None):
+        self.metadata = metadata or {}
+        self.names: List[str] = []
+        self._by_name: Dict[str, Dict] = {}
+        self._by_id: Dict[int, Dict] = {}
+        for row in rows:
+            pokemon = dict(zip(SNAPSHOT_FIELDS, row))
+            self.names.append(pokemon["name"])
+            self._by_name[pokemon["name"]] = pokemon
+            self._by_id[pokemon["id"]] = pokemon
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def get(self, key: Union[str, int]) -> Optional[Dict]:
+        """Look up a Pokémon by name or id."""
+        if isinstance(key, int) or key.isdigit():
+            return self._by_id.get(int(key))
+        return self._by_name.get(key.lower())
+
+def read_snapshot(path: str = SNAPSHOT_FILE) -> Optional[Dict]:
+    """Read a raw snapshot file, or return None if it is missing or unreadable."""
+    try:
+        with Path(path).open('r') as f:
+            snapshot = json.load(f)
+    except (json.JSONDecodeError, FileNotFoundError):
+        return None
+    if snapshot.get("version") != SNAPSHOT_VERSION:
+        logger.error(f"Unsupported snapshot version in {path}: {snapshot.get('version')}")
+        return None
+    return snapshot
+
+_pokedexes: Dict[str, Pokedex] = {}
+
+def load_pokedex(path: str = SNAPSHOT_FILE) -> Optional[Pokedex]:
+    """Load each snapshot file once per process and return the indexed Pokédex."""
+    if path not in _pokedexes:
+        snapshot = read_snapshot(path)
+        if snapshot is None:
+            logger.error(f"No usable Pokédex snapshot at {path}. Build one with: python -m pokemon_game.snapshot")
+            return None
+        metadata = {k: v for k, v in snapshot.items() if k != "rows"}
+        _pokedexes[path] = Pokedex(snapshot["rows"], metadata)
+    return _pokedexes[path]
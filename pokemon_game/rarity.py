@@ -0,0 +1,37 @@
+from typing import Dict, Iterable
+
+# Species PokeAPI flags as is_legendary / is_mythical (/pokemon-species/<name>).
+# Kept here so drawing needs no extra request per species; forms such as
+# "deoxys-attack" or "giratina-origin" inherit their species' tier.
+LEGENDARY_SPECIES = frozenset("""
+    articuno zapdos moltres mewtwo raikou entei suicune lugia ho-oh
+    regirock regice registeel latias latios kyogre groudon rayquaza
+    uxie mesprit azelf dialga palkia heatran regigigas giratina cresselia
+    cobalion terrakion virizion tornadus thundurus reshiram zekrom landorus kyurem
+    xerneas yveltal zygarde
+    type-null silvally tapu-koko tapu-lele tapu-bulu tapu-fini cosmog cosmoem solgaleo lunala necrozma
+    zacian zamazenta eternatus kubfu urshifu regieleki regidrago glastrier spectrier calyrex enamorus
+    wo-chien chien-pao ting-lu chi-yu koraidon miraidon okidogi munkidori fezandipiti ogerpon terapagos
+""".split())
+
+MYTHICAL_SPECIES = frozenset("""
+    mew celebi jirachi deoxys phione manaphy darkrai shaymin arceus
+    victini keldeo meloetta genesect diancie hoopa volcanion magearna marshadow
+    zeraora meltan melmetal zarude pecharunt
+""".split())
+
+def rarity_tier(name: str) -> str:
+    """Rarity tier of a Pokémon or form name: "mythical", "legendary" or "common"."""
+    parts = name.split("-")
+    for end in range(len(parts), 0, -1):  # Longest prefix first: "tapu-koko", then "tapu"
+        species = "-".join(parts[:end])
+        if species in MYTHICAL_SPECIES:
+            return "mythical"
+        if species in LEGENDARY_SPECIES:
+            return "legendary"
+    return "common"
+
+def rarity_index(names: Iterable[str]) -> Dict[str, str]:
+    """Map each non-common name to its tier (the shape DrawEngine takes)."""
+    tiers = {name: rarity_tier(name) for name in names}
+    return {name: tier for name, tier in tiers.items() if tier != "common"}
@@ -0,0 +1,84 @@
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+import requests
+
+try:
+    from .api import prefetch_details
+    from .client import http_get
+    from .config import POKEAPI_BASE, SNAPSHOT_FILE, HTTP_POOL_SIZE, OFFLINE_MODE, logger, handle_error
+    from .pokedex import SNAPSHOT_VERSION, SNAPSHOT_FIELDS, read_snapshot
+except ImportError:
+    from api import prefetch_details
+    from client import http_get
+    from config import POKEAPI_BASE, SNAPSHOT_FILE, HTTP_POOL_SIZE, OFFLINE_MODE, logger, handle_error
+    from pokedex import SNAPSHOT_VERSION, SNAPSHOT_FIELDS, read_snapshot
+
+LIST_URL = f"{POKEAPI_BASE}/pokemon?limit=100000"
+
+def build_snapshot(path: str = SNAPSHOT_FILE, concurrency: int = HTTP_POOL_SIZE, force: bool = False) -> Optional[Dict]:
+    """Download the full Pokémon list and all details into a snapshot file.
+
+    Unless `force` is set, an existing snapshot is kept when PokeAPI reports
+    (via its ETag) that the species list has not changed. A snapshot with
+    missing details is written without the ETag, so the next run rebuilds it.
+    """
+    if OFFLINE_MODE:
+        handle_error("Building a snapshot needs PokeAPI. Unset POKEMON_OFFLINE and try again.")
+    existing = None if force else read_snapshot(path)
+    headers = {"If-None-Match": existing["etag"]} if existing and existing.get("etag") else {}
+    try:
+        response = http_get(LIST_URL, headers=headers)
+        if response.status_code == 304:
+            logger.info(f"Snapshot {path} is up to date ({existing['count']} Pokémon).")
+            return existing
+        response.raise_for_status()
+        names = [p["name"] for p in response.json()["results"]]
+    except requests.RequestException as e:
+        logger.error(f"Error fetching Pokémon list: {e}")
+        return None
+
+    logger.info(f"Fetching details for {len(names)} Pokémon...")
+    details = sorted(prefetch_details(names, concurrency), key=lambda p: p["id"])
+    complete = len(details) == len(names)
+    if not complete:
+        logger.warning(f"{len(names) - len(details)} Pokémon could not be fetched and are missing from the snapshot. "
+                       "Run the build again to fill them in.")
+
+    snapshot = {
+        "version": SNAPSHOT_VERSION,
+        "created_at": int(time.time()),
+        "source": POKEAPI_BASE,
+        "etag": response.headers.get("ETag") if complete else None,
+        "count": len(details),
+        "fields": SNAPSHOT_FIELDS,
+        "rows": [[p[field] for field in SNAPSHOT_FIELDS] for p in details]
+    }
+    file_path = Path(path)
+    tmp_path = file_path.with_name(file_path.name + ".tmp")
+    try:
+        with tmp_path.open('w') as f:
+            json.dump(snapshot, f, separators=(",", ":"))
+        os.replace(tmp_path, file_path)
+    except PermissionError:
+        handle_error(f"Cannot write {path}. Check permissions.")
+    logger.info(f"Wrote {len(details)} Pokémon to {path}.")
+    return snapshot
+
+def main() -> None:
+    """Command-line entry point for building the offline snapshot."""
+    parser = argparse.ArgumentParser(description="Build an offline Pokédex snapshot from PokeAPI.")
+    parser.add_argument("--output", default=SNAPSHOT_FILE, help="snapshot file to write")
+    parser.add_argument("--concurrency", type=int, default=HTTP_POOL_SIZE, help="parallel detail requests")
+    parser.add_argument("--force", action="store_true", help="rebuild even if the list is unchanged")
+    args = parser.parse_args()
+    if build_snapshot(args.output, args.concurrency, args.force) is None:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
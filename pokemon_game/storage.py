@@ -0,0 +1,352 @@
+import argparse
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+try:
+    from .config import (JSON_FILE, SQLITE_FILE, STORAGE_BACKEND, DEFAULT_USER, JOURNAL_FSYNC,
+                         JOURNAL_COMPACT_EVERY, logger, handle_error)
+except ImportError:
+    from config import (JSON_FILE, SQLITE_FILE, STORAGE_BACKEND, DEFAULT_USER, JOURNAL_FSYNC,
+                        JOURNAL_COMPACT_EVERY, logger, handle_error)
+
+USER_PATTERN = re.compile(r"^[A-Za-z0-9_-]+$")
+
+def check_user(user: str) -> str:
+    """Reject user names that can't safely be used in a file name."""
+    if not USER_PATTERN.match(user):
+        handle_error(f"Invalid user name '{user}'. Use letters, digits, '-' and '_' only.")
+    return user
+
+def collection_path(user: str = DEFAULT_USER) -> str:
+    """Return the JSON collection file of a user; DEFAULT_USER owns JSON_FILE."""
+    if check_user(user) == DEFAULT_USER:
+        return JSON_FILE
+    path = Path(JSON_FILE)
+    return str(path.with_name(f"{path.stem}.{user}{path.suffix}"))
+
+def _write_json_atomic(path: Path, data: Dict, fsync: bool = False) -> None:
+    """Write JSON to a temp file and rename it over `path`."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    with tmp_path.open('w') as f:
+        json.dump(data, f, indent=2)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+class JsonStorage:
+    """Original storage: the whole collection rewritten to one JSON file."""
+
+    def __init__(self, user: str = DEFAULT_USER, path: Optional[str] = None):
+        self.user = user
+        self.path = Path(path or collection_path(user))
+
+    def initialize(self) -> None:
+        """Create the collection file if it doesn't exist."""
+        if not self.path.exists():
+            try:
+                _write_json_atomic(self.path, {"pokemon": []})
+            except PermissionError:
+                handle_error(f"Cannot create {self.path}. Check permissions.")
+
+    def load(self) -> Dict:
+        """Load the collection."""
+        try:
+            with self.path.open('r') as f:
+                return json.load(f)
+        except (json.JSONDecodeError, FileNotFoundError):
+            return {"pokemon": []}
+
+    def save(self, data: Dict) -> None:
+        """Save the whole collection."""
+        try:
+            _write_json_atomic(self.path, data)
+        except PermissionError:
+            handle_error(f"Cannot write to {self.path}. Check permissions.")
+
+    def append(self, pokemon: Dict) -> None:
+        """Add one Pokémon to the stored collection."""
+        self.append_many([pokemon])
+
+    def append_many(self, pokemon: Iterable[Dict]) -> None:
+        """Add several Pokémon with a single rewrite."""
+        data = self.load()
+        data["pokemon"].extend(pokemon)
+        self.save(data)
+
+class JournalStorage(JsonStorage):
+    """JSON snapshot plus an append-only journal with one line per added Pokémon.
+
+    Saves only append the new records, so each draw is a constant-size write
+    and a crash can at worst tear the last journal line, which is ignored on
+    load. Every `compact_every` records the journal is folded back into the
+    snapshot file and truncated.
+
+    Journal records carry a sequence number and the snapshot stores the
+    last one it contains ("journal_seq"). A journal left behind by a crash
+    between writing the snapshot and truncating the journal is then skipped
+    instead of replayed, which would bring back removed Pokémon.
+    """
+
+    def __init__(self, user: str = DEFAULT_USER, path: Optional[str] = None, journal_path: Optional[str] = None,
+                 fsync: str = JOURNAL_FSYNC, compact_every: int = JOURNAL_COMPACT_EVERY):
+        super().__init__(user, path)
+        self.journal_path = Path(journal_path or f"{self.path}.journal")
+        self.fsync = fsync
+        self.compact_every = compact_every
+        self._pokemon: List[Dict] = []
+        self._names = set()
+        self._journal_records = 0
+        self._seq = 0  # Sequence number of the last record written or read
+        self._loaded = False
+
+    def _remember(self, pokemon: Dict) -> bool:
+        if pokemon["name"] in self._names:
+            return False
+        self._names.add(pokemon["name"])
+        self._pokemon.append(pokemon)
+        return True
+
+    def load(self) -> Dict:
+        """Load the snapshot and replay the journal on top of it."""
+        self._pokemon, self._names, self._journal_records = [], set(), 0
+        self._loaded = True
+        snapshot = super().load()
+        checkpoint = self._seq = snapshot.get("journal_seq", 0)
+        for pokemon in snapshot["pokemon"]:
+            self._remember(pokemon)
+        try:
+            journal = self.journal_path.read_bytes()
+        except FileNotFoundError:
+            journal = b""
+        complete, _, torn = journal.rpartition(b"\n")
+        if torn:
+            # A write interrupted mid-record; drop it so the next append starts on a clean line.
+            logger.warning(f"Discarding torn record at the end of {self.journal_path}")
+            os.truncate(self.journal_path, len(journal) - len(torn))
+        for line in complete.splitlines():
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"Skipping unreadable record in {self.journal_path}")
+                continue
+            if "seq" in record:
+                if record["seq"] <= checkpoint:
+                    continue  # Already folded into the snapshot
+                self._seq, pokemon = record["seq"], record["pokemon"]
+            else:
+                pokemon = record  # Written before records were numbered
+            self._journal_records += 1
+            self._remember(pokemon)
+        if self._journal_records >= self.compact_every:
+            self.compact()
+        return {"pokemon": list(self._pokemon)}
+
+    def save(self, data: Dict) -> None:
+        """Journal the Pokémon added since the last load/save.
+
+        Anything other than appending (removals, reordering) falls back to
+        rewriting the snapshot.
+        """
+        if not self._loaded:
+            self.load()
+        items = data["pokemon"]
+        known = len(self._pokemon)
+        if len(items) < known or (known and items[known - 1]["name"] != self._pokemon[-1]["name"]):
+            self._pokemon, self._names = [], set()
+            for pokemon in items:
+                self._remember(pokemon)
+            self.compact()
+            return
+        self.append_many(items[known:])
+
+    def append_many(self, pokemon: Iterable[Dict]) -> None:
+        """Append Pokémon to the journal with one write (and at most one fsync)."""
+        if not self._loaded:
+            self.load()
+        records = []
+        for p in pokemon:
+            if self._remember(p):
+                self._seq += 1
+                records.append(json.dumps({"seq": self._seq, "pokemon": p}, separators=(",", ":")) + "\n")
+        if not records:
+            return
+        try:
+            with self.journal_path.open('a') as f:
+                f.write("".join(records))
+                if self.fsync == "always":
+                    f.flush()
+                    os.fsync(f.fileno())
+        except PermissionError:
+            handle_error(f"Cannot write to {self.journal_path}. Check permissions.")
+        self._journal_records += len(records)
+        if self._journal_records >= self.compact_every:
+            self.compact()
+
+    def compact(self) -> None:
+        """Fold the journal into the snapshot file and truncate it."""
+        try:
+            _write_json_atomic(self.path, {"pokemon": self._pokemon, "journal_seq": self._seq},
+                               fsync=self.fsync != "never")
+            # A crash here leaves a stale journal; its records are at or below journal_seq and skipped.
+            self.journal_path.open('w').close()
+        except PermissionError:
+            handle_error(f"Cannot write to {self.path}. Check permissions.")
+        self._journal_records = 0
+
+class SqliteStorage:
+    """SQLite storage holding the collections of many users in one database.
+
+    The database runs in WAL mode so concurrent game sessions can read while
+    another one writes. Rows are keyed on (user, name), with a separate
+    (user, type) index for type lookups. Each thread gets its own connection.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS pokemon (
+            user TEXT NOT NULL,
+            name TEXT NOT NULL,
+            id INTEGER NOT NULL,
+            types TEXT NOT NULL,
+            height INTEGER,
+            added_at REAL NOT NULL,
+            PRIMARY KEY (user, name)
+        );
+        CREATE TABLE IF NOT EXISTS pokemon_types (
+            user TEXT NOT NULL,
+            type TEXT NOT NULL,
+            name TEXT NOT NULL,
+            PRIMARY KEY (user, type, name)
+        );
+    """
+
+    def __init__(self, user: str = DEFAULT_USER, path: str = SQLITE_FILE):
+        self.user = check_user(user)
+        self.path = path
+        self._local = threading.local()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            try:
+                conn = sqlite3.connect(self.path, timeout=30)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.executescript(self.SCHEMA)
+            except sqlite3.Error as e:
+                handle_error(f"Cannot open {self.path}: {e}")
+            self._local.conn = conn
+        return conn
+
+    def initialize(self) -> None:
+        """Create the database and tables if they don't exist."""
+        self.connection
+
+    def load(self) -> Dict:
+        """Load this user's collection in the order it was collected."""
+        rows = self.connection.execute(
+            "SELECT name, id, types, height FROM pokemon WHERE user = ? ORDER BY rowid", (self.user,)
+        )
+        return {"pokemon": [
+            {"name": name, "id": pokemon_id, "types": json.loads(types), "height": height}
+            for name, pokemon_id, types, height in rows
+        ]}
+
+    def save(self, data: Dict) -> None:
+        """Replace this user's collection with `data` in one transaction."""
+        with self.connection as conn:
+            stored = {name for (name,) in conn.execute("SELECT name FROM pokemon WHERE user = ?", (self.user,))}
+            removed = [(self.user, name) for name in stored - {p["name"] for p in data["pokemon"]}]
+            conn.executemany("DELETE FROM pokemon WHERE user = ? AND name = ?", removed)
+            conn.executemany("DELETE FROM pokemon_types WHERE user = ? AND name = ?", removed)
+            self._insert(conn, [p for p in data["pokemon"] if p["name"] not in stored])
+
+    def append(self, pokemon: Dict) -> None:
+        """Add one Pokémon to this user's collection."""
+        self.append_many([pokemon])
+
+    def append_many(self, pokemon: Iterable[Dict]) -> None:
+        """Add several Pokémon in a single transaction."""
+        with self.connection as conn:
+            self._insert(conn, pokemon)
+
+    def _insert(self, conn: sqlite3.Connection, pokemon: Iterable[Dict]) -> None:
+        now = time.time()
+        pokemon = list(pokemon)
+        conn.executemany(
+            "INSERT OR IGNORE INTO pokemon (user, name, id, types, height, added_at) VALUES (?, ?, ?, ?, ?, ?)",
+            [(self.user, p["name"], p["id"], json.dumps(p["types"]), p.get("height"), now) for p in pokemon]
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO pokemon_types (user, type, name) VALUES (?, ?, ?)",
+            [(self.user, t, p["name"]) for p in pokemon for t in p["types"]]
+        )
+
+    def names_by_type(self, type_name: str) -> List[str]:
+        """Return the names of this user's Pokémon of one type."""
+        rows = self.connection.execute(
+            "SELECT name FROM pokemon_types WHERE user = ? AND type = ?", (self.user, type_name)
+        )
+        return [name for (name,) in rows]
+
+BACKENDS = {
+    "json": JsonStorage,
+    "journal": JournalStorage,
+    "sqlite": SqliteStorage
+}
+
+_storages: Dict[str, object] = {}
+
+def get_storage(user: str = DEFAULT_USER):
+    """Return the storage backend selected by STORAGE_BACKEND for a user."""
+    if user not in _storages:
+        if STORAGE_BACKEND not in BACKENDS:
+            handle_error(f"Unknown storage backend '{STORAGE_BACKEND}'. Choose one of: {', '.join(BACKENDS)}")
+        _storages[user] = BACKENDS[STORAGE_BACKEND](user)
+    return _storages[user]
+
+def find_json_collections() -> Dict[str, str]:
+    """Map each user with a JSON collection file to that file."""
+    path = Path(JSON_FILE)
+    found = {}
+    if path.exists() or Path(f"{JSON_FILE}.journal").exists():
+        found[DEFAULT_USER] = JSON_FILE
+    for pattern in (f"{path.stem}.*{path.suffix}", f"{path.stem}.*{path.suffix}.journal"):
+        for user_file in path.parent.glob(pattern):
+            user = user_file.name[len(path.stem) + 1:].split(".")[0]
+            if USER_PATTERN.match(user):
+                found[user] = collection_path(user)
+    return found
+
+def migrate_json_to_sqlite(db_path: str = SQLITE_FILE) -> Dict[str, int]:
+    """Copy every JSON/journal collection into the SQLite database.
+
+    Pokémon already in the database are left alone, so running it twice is
+    harmless. Returns the number of Pokémon read per user.
+    """
+    migrated = {}
+    for user, json_path in find_json_collections().items():
+        pokemon = JournalStorage(user, json_path).load()["pokemon"]
+        SqliteStorage(user, db_path).append_many(pokemon)
+        migrated[user] = len(pokemon)
+        logger.info(f"Migrated {len(pokemon)} Pokémon for {user} from {json_path}.")
+    return migrated
+
+def main() -> None:
+    """Command-line entry point for the JSON to SQLite migration."""
+    parser = argparse.ArgumentParser(description="Migrate JSON collections into the SQLite backend.")
+    parser.add_argument("--db", default=SQLITE_FILE, help="SQLite database to write")
+    args = parser.parse_args()
+    migrated = migrate_json_to_sqlite(args.db)
+    if not migrated:
+        logger.info("No JSON collections found.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import requests
+
+try:
+    from .client import backoff, http_request
+    from .config import (BACKEND_API_URL, DEFAULT_USER, SYNC_QUEUE_FILE, SYNC_STATE_FILE, SYNC_BATCH_SIZE,
+                         SYNC_INTERVAL, SYNC_PULL_PAGE, logger)
+    from .storage import check_user
+except ImportError:
+    from client import backoff, http_request
+    from config import (BACKEND_API_URL, DEFAULT_USER, SYNC_QUEUE_FILE, SYNC_STATE_FILE, SYNC_BATCH_SIZE,
+                        SYNC_INTERVAL, SYNC_PULL_PAGE, logger)
+    from storage import check_user
+
+def user_path(path: str, user: str = DEFAULT_USER) -> Path:
+    """Per-user variant of a sync file, named like the user's collection file."""
+    path = Path(path)
+    if check_user(user) == DEFAULT_USER:
+        return path
+    return path.with_name(f"{path.stem}.{user}{path.suffix}")
+
+def to_backend(pokemon: Dict, owner: str) -> Dict:
+    """A collection entry as a backend document of `owner`; `type` is the primary type."""
+    return {
+        "owner": owner,
+        "name": pokemon["name"],
+        "type": pokemon["types"][0] if pokemon["types"] else "unknown",
+        "types": pokemon["types"],
+        "id": pokemon["id"],
+        "height": pokemon.get("height")
+    }
+
+def from_backend(doc: Dict) -> Optional[Dict]:
+    """A backend document as a collection entry, or None if it lacks the game's fields."""
+    if not isinstance(doc.get("name"), str) or not isinstance(doc.get("id"), int):
+        return None
+    types = doc.get("types") or ([doc["type"]] if doc.get("type") else [])
+    return {"name": doc["name"], "id": doc["id"], "types": types, "height": doc.get("height")}
+
+class SyncQueue:
+    """Pokémon waiting to be pushed, kept in memory and in an append-only file.
+
+    put_many() appends one line per Pokémon; remove() rewrites the file with
+    what is left, so the queue survives restarts and offline sessions.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._pending: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        try:
+            lines = self.path.read_text().splitlines()
+        except FileNotFoundError:
+            lines = []
+        for line in lines:
+            try:
+                pokemon = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Torn last line; it is rewritten on the next remove()
+            self._pending[pokemon["name"]] = pokemon
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def put_many(self, pokemon: Iterable[Dict]) -> None:
+        with self._lock:
+            new = [p for p in pokemon if p["name"] not in self._pending]
+            if not new:
+                return
+            with self.path.open('a') as f:
+                f.write("".join(json.dumps(p, separators=(",", ":")) + "\n" for p in new))
+            for p in new:
+                self._pending[p["name"]] = p
+
+    def peek(self, count: int) -> List[Dict]:
+        """The oldest `count` queued Pokémon, left in the queue."""
+        with self._lock:
+            return list(self._pending.values())[:count]
+
+    def remove(self, names: Iterable[str]) -> None:
+        with self._lock:
+            for name in names:
+                self._pending.pop(name, None)
+            tmp_path = self.path.with_name(self.path.name + ".tmp")
+            with tmp_path.open('w') as f:
+                f.write("".join(json.dumps(p, separators=(",", ":")) + "\n" for p in self._pending.values()))
+            os.replace(tmp_path, self.path)
+
+class BackendSync:
+    """Keeps a local collection and the backend CRUD API in step.
+
+    Draws are queued locally (enqueue() never touches the network) and a
+    background thread pushes them to POST /pokemon/_bulk in batches over the
+    shared keep-alive session, backing off while the backend is unreachable.
+    Documents carry the user as their `owner`; the backend keeps names unique
+    per owner, and a 409 counts as pushed only once the existing document is
+    confirmed to be this user's. pull() pages through this user's documents
+    after the last _id it has seen, so each call only transfers documents
+    created since the previous one.
+    """
+
+    def __init__(self, base_url: str, user: str = DEFAULT_USER, batch_size: int = SYNC_BATCH_SIZE,
+                 interval: float = SYNC_INTERVAL):
+        self.base_url = base_url.rstrip("/")
+        self.user = user
+        self.batch_size = batch_size
+        self.interval = interval
+        self.queue = SyncQueue(user_path(SYNC_QUEUE_FILE, user))
+        self.state_path = user_path(SYNC_STATE_FILE, user)
+        self.failures = 0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def enqueue(self, pokemon: Dict) -> None:
+        """Queue one newly drawn Pokémon for the next push."""
+        self.enqueue_many([pokemon])
+
+    def enqueue_many(self, pokemon: Iterable[Dict]) -> None:
+        self.queue.put_many(pokemon)
+        if len(self.queue) >= self.batch_size:
+            self._wake.set()
+
+    def _owns(self, name: str) -> bool:
+        """Whether the backend's document named `name` is this user's (after a 409)."""
+        response = http_request("GET", f"{self.base_url}/pokemon/name/{name}", params={"owner": self.user})
+        if response.status_code == 404:
+            return False
+        response.raise_for_status()
+        return response.json().get("owner") == self.user  # A backend without owners ignores the filter
+
+    def push(self) -> int:
+        """Push queued Pokémon in batches until the queue is empty or a batch fails.
+
+        Returns the number pushed; raises requests.RequestException if the
+        backend could not be reached.
+        """
+        pushed = 0
+        while True:
+            batch = self.queue.peek(self.batch_size)
+            if not batch:
+                return pushed
+            response = http_request("POST", f"{self.base_url}/pokemon/_bulk",
+                                    json=[to_backend(p, self.user) for p in batch])
+            if response.status_code != 200:
+                raise requests.HTTPError(f"POST /pokemon/_bulk returned {response.status_code}", response=response)
+            done, dropped = [], []
+            for result in response.json()["results"]:
+                name = batch[result["index"]]["name"]
+                if result["status"] in (200, 201):
+                    done.append(name)
+                elif result["status"] == 409 and self._owns(name):
+                    done.append(name)  # Pushed before, but the response was lost
+                elif result["status"] == 409:
+                    logger.warning(f"Backend holds {name} for another user; dropping it from the sync queue")
+                    dropped.append(name)
+                elif result["status"] == 400:
+                    logger.warning(f"Backend rejected {name}: {result.get('error')}; dropping it from the sync queue")
+                    dropped.append(name)
+            self.queue.remove(done + dropped)
+            pushed += len(done)
+            if len(done) + len(dropped) < len(batch):
+                return pushed  # Per-item server errors; retried on the next push
+
+    def _cursor(self) -> Optional[str]:
+        try:
+            with self.state_path.open('r') as f:
+                return json.load(f).get("after")
+        except (json.JSONDecodeError, FileNotFoundError, AttributeError):
+            return None
+
+    def _save_cursor(self, cursor: str) -> None:
+        tmp_path = self.state_path.with_name(self.state_path.name + ".tmp")
+        with tmp_path.open('w') as f:
+            json.dump({"after": cursor}, f)
+        os.replace(tmp_path, self.state_path)
+
+    def pull(self, collection, **request_kwargs) -> List[Dict]:
+        """Add this user's backend Pokémon created since the last pull to `collection`.
+
+        Only new documents are fetched; updates to documents already pulled
+        are not. `request_kwargs` go to http_request() (e.g. timeout,
+        retries). Returns the Pokémon that were added.
+        """
+        cursor = self._cursor()
+        added = []
+        while True:
+            params = {"limit": SYNC_PULL_PAGE, "owner": self.user, "fields": "owner,name,id,type,types,height"}
+            if cursor:
+                params["after"] = cursor
+            response = http_request("GET", f"{self.base_url}/pokemon", params=params, **request_kwargs)
+            response.raise_for_status()
+            page = response.json()
+            if not page:
+                break
+            mine = (from_backend(doc) for doc in page if doc.get("owner") == self.user)  # In case owner is ignored
+            added.extend(collection.add_many(p for p in mine if p))
+            cursor = page[-1]["_id"]
+            self._save_cursor(cursor)
+            if len(page) < SYNC_PULL_PAGE:
+                break
+        if added:
+            logger.info(f"Pulled {len(added)} Pokémon from the backend")
+        return added
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if not len(self.queue):
+                continue
+            try:
+                self.push()
+                self.failures = 0
+            except (requests.RequestException, ValueError, KeyError) as e:
+                self.failures += 1
+                delay = backoff(self.failures)
+                logger.debug(f"Backend sync failed ({e}); {len(self.queue)} queued, retrying in {delay:.1f}s")
+                self._stop.wait(delay)
+
+    def start(self) -> None:
+        """Push in a background thread until stop() is called."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="backend-sync", daemon=True)
+            self._thread.start()
+
+    def stop(self, flush: bool = True) -> None:
+        """Stop the background thread, then make one last push attempt if `flush`."""
+        if self._thread is not None:
+            self._stop.set()
+            self._wake.set()
+            self._thread.join()
+            self._thread = None
+        if flush and len(self.queue):
+            try:
+                self.push()
+            except (requests.RequestException, ValueError, KeyError) as e:
+                logger.warning(f"Backend unavailable ({e}); {len(self.queue)} Pokémon stay queued for the next sync")
+
+def get_sync(user: str = DEFAULT_USER) -> Optional[BackendSync]:
+    """The configured BackendSync for a user, or None when BACKEND_API_URL is unset."""
+    if not BACKEND_API_URL:
+        return None
+    return BackendSync(BACKEND_API_URL, user)